@@ -1,34 +1,66 @@
+import argparse
+import time
+
 import pandas as pd
 import requests
 
-# Fetch Binance Order Book Data
-url = "https://api.binance.com/api/v3/depth"
-params = {"symbol": "BTCUSDT", "limit": 5000}
-response = requests.get(url, params=params)
-order_book = response.json()
-
-# Create DataFrame
-df = pd.DataFrame(
-    {
-        "Bid Price": [float(bid[0]) for bid in order_book["bids"]],
-        "Bid Quantity": [float(bid[1]) for bid in order_book["bids"]],
-        "Ask Price": [float(ask[0]) for ask in order_book["asks"]],
-        "Ask Quantity": [float(ask[1]) for ask in order_book["asks"]],
-    }
-)
-
-print(df)
-
-# Calculate Total Liquidity
-total_bid_volume = df["Bid Quantity"].sum()
-total_ask_volume = df["Ask Quantity"].sum()
-
-# Determine Order Book Imbalance
-imbalance = total_bid_volume - total_ask_volume
-dominance = "Buyers (Bullish)" if imbalance > 0 else "Sellers (Bearish)"
-
-# Display Results
-print(f"Total Bid Volume: {total_bid_volume:.2f}")
-print(f"Total Ask Volume: {total_ask_volume:.2f}")
-print(f"Order Book Imbalance: {imbalance:.2f}")
-print(f"Dominating Side: {dominance}")
+from domScanner import format_table, scan
+from orderBook import analyze_order_book, parse_order_book
+
+
+def run_scan(symbols, limit):
+    started = time.perf_counter()
+    rows = scan(symbols, limit=limit)
+    print(format_table(rows))
+    print(
+        f"Scanned {len(rows)}/{len(symbols)} symbols in {time.perf_counter() - started:.2f}s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Binance order book imbalance")
+    parser.add_argument(
+        "--scan", nargs="+", metavar="SYMBOL", help="rank several symbols concurrently"
+    )
+    parser.add_argument("--limit", type=int, default=100, help="depth levels per scan")
+    args = parser.parse_args()
+    if args.scan:
+        run_scan(args.scan, args.limit)
+        return
+
+    # Fetch Binance Order Book Data
+    url = "https://api.binance.com/api/v3/depth"
+    params = {"symbol": "BTCUSDT", "limit": 5000}
+    response = requests.get(url, params=params)
+    order_book = response.json()
+
+    bids, asks = parse_order_book(order_book)
+
+    # Create DataFrames
+    print(pd.DataFrame(bids, columns=["Bid Price", "Bid Quantity"]))
+    print(pd.DataFrame(asks, columns=["Ask Price", "Ask Quantity"]))
+
+    stats = analyze_order_book(bids, asks)
+
+    # Determine Order Book Imbalance
+    imbalance = stats["imbalance"]
+    dominance = "Buyers (Bullish)" if imbalance > 0 else "Sellers (Bearish)"
+
+    # Display Results
+    print(f"Total Bid Volume: {stats['total_bid_volume']:.2f}")
+    print(f"Total Ask Volume: {stats['total_ask_volume']:.2f}")
+    print(f"Order Book Imbalance: {imbalance:.2f}")
+    print(f"Dominating Side: {dominance}")
+    print(f"Spread: {stats['spread']:.2f} ({stats['spread_bps']:.2f} bps)")
+    print(f"Microprice: {stats['microprice']:.2f}")
+    for band, depth in stats["bands"].items():
+        print(
+            f"Imbalance within {band:.1%} of mid: {depth['imbalance']:+.3f} "
+            f"(bids {depth['bid_volume']:.2f} / asks {depth['ask_volume']:.2f})"
+        )
+    for size, price in stats["vwap_buy"].items():
+        print(f"VWAP to buy {size:g}: {price:.2f}, to sell: {stats['vwap_sell'][size]:.2f}")
+
+
+if __name__ == "__main__":
+    main()
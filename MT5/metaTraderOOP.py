@@ -1,9 +1,15 @@
 import logging
 import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from getpass import getpass
 
 import MetaTrader5 as mt5
+from symbolCache import SymbolCache
+from tickFeed import TickFeed
+from tradeCopier import TradeCopier
+from tradeSync import TradeSync
 
 # Configure logging
 logging.basicConfig(
@@ -17,18 +23,39 @@ open_trades = {}
 pending_orders = {}
 symbol = "BTCUSD"
 
+PENDING_ORDER_TYPES = {
+    "buy_limit": mt5.ORDER_TYPE_BUY_LIMIT,
+    "sell_limit": mt5.ORDER_TYPE_SELL_LIMIT,
+    "buy_stop": mt5.ORDER_TYPE_BUY_STOP,
+    "sell_stop": mt5.ORDER_TYPE_SELL_STOP,
+}
+REQUOTE_RETCODES = (mt5.TRADE_RETCODE_REQUOTE, mt5.TRADE_RETCODE_PRICE_CHANGED)
+# Rejections that suggest the cached symbol metadata is out of date
+SYMBOL_RETCODES = (
+    mt5.TRADE_RETCODE_INVALID_VOLUME,
+    mt5.TRADE_RETCODE_INVALID_PRICE,
+    mt5.TRADE_RETCODE_INVALID_FILL,
+)
+
 
 class TradingTool:
-    def __init__(self):
-        self.account = {
+    def __init__(self, account=None):
+        self.account = account or {
             "server": os.getenv("MT5_SERVER", "Exness-MT5Trial8"),
             "login": int(os.getenv("MT5_LOGIN", "79555324")),
-            "password": os.getenv("MT5_PASSWORD", getpass("Enter MT5 password: ")),
+            "password": os.getenv("MT5_PASSWORD"),
         }
         self.magic_number = 12345  # Unique identifier for script-generated trades
+        self.deviation = 20  # Maximum accepted slippage in points
+        self.trade_sync = TradeSync(mt5, open_trades, pending_orders)
+        self.symbols = SymbolCache(mt5)
+        self.tick_feed = None
+        self.copier = None
 
     def connect_to_account(self):
         """Connect to the MetaTrader 5 account."""
+        if not self.account.get("password"):
+            self.account["password"] = getpass("Enter MT5 password: ")
         retries = 3
         for attempt in range(1, retries + 1):
             if mt5.initialize(
@@ -81,41 +108,209 @@ class TradingTool:
 
     def initialize_trade_tracking(self):
         """Fetch and track open trades and pending orders."""
-        global open_trades, pending_orders
-        open_trades = {}
-        pending_orders = {}
-
-        positions = mt5.positions_get() or []
-        orders = mt5.orders_get() or []
-
-        for pos in positions:
-            open_trades[pos.ticket] = {
-                "symbol": pos.symbol,
-                "direction": "buy" if pos.type == mt5.ORDER_TYPE_BUY else "sell",
-                "lot_size": pos.volume,
-                "tp": pos.tp,
-                "sl": pos.sl,
-                "type": pos.type,
-            }
-
-        for order in orders:
-            pending_orders[order.ticket] = {
-                "symbol": order.symbol,
-                "lot_size": order.volume_current,
-                "price": order.price_open,
-                "tp": order.tp,
-                "sl": order.sl,
-                "type": order.type,
-            }
-
+        self.trade_sync.sync(force=True)
         logging.info(
             f"Initialized trades: {len(open_trades)} open, {len(pending_orders)} pending."
         )
 
+    def refresh_trade_tracking(self):
+        """Apply only the position/order changes since the last sync."""
+        self.trade_sync.sync()
+
+    def start_tick_feed(self, symbols=None):
+        """Stream ticks for ``symbols`` (default: the tool's symbol) into memory."""
+        self.tick_feed = TickFeed(mt5, symbols or [symbol])
+        self.tick_feed.start()
+
+    def start_copier(self, followers, **kwargs):
+        """Copy this account's positions onto ``followers`` in the background."""
+        self.copier = TradeCopier(mt5, followers, **kwargs)
+        self.copier.start()
+        return self.copier
+
+    def get_tick(self, symbol, fresh=False):
+        """Fetch the latest tick for a symbol, logging on failure.
+
+        Ticks come from the tick feed when it covers the symbol, unless
+        ``fresh`` asks for a direct read from the terminal (e.g. after a
+        requote, when the buffered quote may be the one just rejected).
+        """
+        if not fresh and self.tick_feed and symbol in self.tick_feed.buffers:
+            tick = self.tick_feed.tick(symbol)
+            if tick:
+                return tick
+        tick = mt5.symbol_info_tick(symbol)
+        if not tick:
+            logging.error(f"Failed to get tick data for {symbol}.")
+        return tick
+
+    def build_market_request(self, symbol, direction, lot_size, price, tp=None, sl=None):
+        """Build the request for a market order."""
+        return {
+            "action": mt5.TRADE_ACTION_DEAL,
+            "symbol": symbol,
+            "volume": self.symbols.normalize_volume(symbol, lot_size),
+            "type": mt5.ORDER_TYPE_BUY if direction == "buy" else mt5.ORDER_TYPE_SELL,
+            "price": price,
+            "deviation": self.deviation,
+            "tp": self.symbols.normalize_price(symbol, tp) or 0.0,
+            "sl": self.symbols.normalize_price(symbol, sl) or 0.0,
+            "magic": self.magic_number,
+            "comment": "Trade placed via script",
+            "type_time": mt5.ORDER_TIME_GTC,
+            "type_filling": self.symbols.filling(symbol),
+        }
+
+    def build_close_request(self, ticket, trade, price, volume=None, comment="Close trade"):
+        """Build the request closing all or part of an open trade.
+
+        Partial volumes are rounded down to the symbol's step; raises
+        ValueError when that leaves less than the minimum volume.
+        """
+        if volume is not None:
+            volume = self.symbols.close_volume(trade["symbol"], volume, trade["lot_size"])
+            if volume is None:
+                raise ValueError(
+                    f"Partial close of {ticket} is below the minimum volume for {trade['symbol']}."
+                )
+        return {
+            "action": mt5.TRADE_ACTION_DEAL,
+            "position": ticket,
+            "symbol": trade["symbol"],
+            "volume": trade["lot_size"] if volume is None else volume,
+            "type": (
+                mt5.ORDER_TYPE_SELL if trade["direction"] == "buy" else mt5.ORDER_TYPE_BUY
+            ),
+            "price": price,
+            "deviation": self.deviation,
+            "magic": self.magic_number,
+            "comment": comment,
+            "type_time": mt5.ORDER_TIME_GTC,
+            "type_filling": self.symbols.filling(trade["symbol"]),
+        }
+
+    def build_sltp_request(self, ticket, tp=None, sl=None):
+        """Build the request updating an open trade's TP/SL."""
+        trade_symbol = open_trades[ticket]["symbol"] if ticket in open_trades else None
+        if trade_symbol:
+            tp = self.symbols.normalize_price(trade_symbol, tp)
+            sl = self.symbols.normalize_price(trade_symbol, sl)
+        return {
+            "action": mt5.TRADE_ACTION_SLTP,
+            "position": ticket,
+            "sl": sl or 0.0,
+            "tp": tp or 0.0,
+        }
+
+    def build_pending_request(self, symbol, order_type, lot_size, price, tp=None, sl=None):
+        """Build the request for a pending order."""
+        return {
+            "action": mt5.TRADE_ACTION_PENDING,
+            "symbol": symbol,
+            "volume": self.symbols.normalize_volume(symbol, lot_size),
+            "type": PENDING_ORDER_TYPES[order_type],
+            "price": self.symbols.normalize_price(symbol, price),
+            "deviation": self.deviation,
+            "tp": float(self.symbols.normalize_price(symbol, tp)) if tp else 0.0,
+            "sl": float(self.symbols.normalize_price(symbol, sl)) if sl else 0.0,
+            "magic": self.magic_number,
+            "comment": "Pending order via script",
+            "type_time": mt5.ORDER_TIME_GTC,
+            "type_filling": self.symbols.filling(symbol),
+        }
+
+    def build_modify_pending_request(self, ticket, price, tp=None, sl=None):
+        """Build the request updating a pending order's price, TP or SL."""
+        order_symbol = (
+            pending_orders[ticket]["symbol"] if ticket in pending_orders else None
+        )
+        if order_symbol:
+            price = self.symbols.normalize_price(order_symbol, price)
+            tp = self.symbols.normalize_price(order_symbol, tp)
+            sl = self.symbols.normalize_price(order_symbol, sl)
+        return {
+            "action": mt5.TRADE_ACTION_MODIFY,
+            "order": ticket,
+            "price": price,
+            "sl": sl or 0.0,
+            "tp": tp or 0.0,
+        }
+
+    @staticmethod
+    def build_remove_pending_request(ticket):
+        """Build the request removing a pending order."""
+        return {
+            "action": mt5.TRADE_ACTION_REMOVE,
+            "order": ticket,
+        }
+
+    def record_result(self, op, request, result):
+        """Mirror a successful request in the tracked trades and orders."""
+        if op == "market":
+            logging.info(f"Trade placed successfully. Ticket: {result.order}")
+            open_trades[result.order] = {
+                "symbol": request["symbol"],
+                "direction": "buy" if request["type"] == mt5.ORDER_TYPE_BUY else "sell",
+                "lot_size": request["volume"],
+                "tp": request["tp"],
+                "sl": request["sl"],
+                "type": request["type"],
+                "magic": request["magic"],
+            }
+        elif op == "update":
+            ticket = request["position"]
+            logging.info(f"Order updated successfully. Ticket: {ticket}")
+            if ticket in open_trades:
+                open_trades[ticket]["tp"] = request["tp"]
+                open_trades[ticket]["sl"] = request["sl"]
+        elif op == "close":
+            ticket = request["position"]
+            trade = open_trades.get(ticket)
+            if trade is None:
+                return
+            if request["volume"] >= trade["lot_size"]:
+                logging.info(f"Trade closed successfully. Ticket: {ticket}")
+                del open_trades[ticket]
+                return
+            logging.info(f"Partial close successful. Ticket: {ticket}")
+            trade["lot_size"] -= request["volume"]
+            if trade["lot_size"] <= 0:
+                del open_trades[ticket]
+        elif op == "pending":
+            logging.info(f"Pending order placed successfully. Ticket: {result.order}")
+            pending_orders[result.order] = {
+                "symbol": request["symbol"],
+                "type": request["type"],
+                "lot_size": request["volume"],
+                "price": request["price"],
+                "tp": request["tp"],
+                "sl": request["sl"],
+            }
+        elif op == "update_pending":
+            ticket = request["order"]
+            logging.info(f"Pending order updated successfully. Ticket: {ticket}")
+            if ticket in pending_orders:
+                pending_orders[ticket]["price"] = request["price"]
+                pending_orders[ticket]["tp"] = request["tp"]
+                pending_orders[ticket]["sl"] = request["sl"]
+        elif op == "remove_pending":
+            ticket = request["order"]
+            logging.info(f"Pending order removed successfully. Ticket: {ticket}")
+            pending_orders.pop(ticket, None)
+
+    def send_request(self, op, request, error_message):
+        """Send a single request and record it if the trade server accepted it."""
+        result, _ = self._timed_send(request)
+        if result is not None and result.retcode == mt5.TRADE_RETCODE_DONE:
+            self.record_result(op, request, result)
+            return True
+        comment = result.comment if result is not None else mt5.last_error()
+        logging.error(f"{error_message} Error: {comment}")
+        return False
+
     def place_order(self):
         """Place a market order."""
-        if not mt5.symbol_select(symbol, True):
-            logging.error(f"Failed to select symbol {symbol}.")
+        if self.symbols.get(symbol) is None:
             return
 
         direction = self.validate_input("Enter direction (buy/sell): ", str).lower()
@@ -133,41 +328,17 @@ class TradingTool:
             "Enter Stop Loss (optional, press Enter to skip): ", float, optional=True
         )
 
-        tick = mt5.symbol_info_tick(symbol)
+        tick = self.get_tick(symbol)
         if not tick:
-            logging.error(f"Failed to get tick data for {symbol}.")
             return
 
         price = tick.ask if direction == "buy" else tick.bid
-        action_type = mt5.ORDER_TYPE_BUY if direction == "buy" else mt5.ORDER_TYPE_SELL
-
-        request = {
-            "action": mt5.TRADE_ACTION_DEAL,
-            "symbol": symbol,
-            "volume": lot_size,
-            "type": action_type,
-            "price": price,
-            "deviation": 20,
-            "tp": tp or 0.0,
-            "sl": sl or 0.0,
-            "magic": self.magic_number,
-            "comment": "Trade placed via script",
-            "type_time": mt5.ORDER_TIME_GTC,
-            "type_filling": mt5.ORDER_FILLING_IOC,
-        }
-
-        result = mt5.order_send(request)
-        if result.retcode == mt5.TRADE_RETCODE_DONE:
-            logging.info(f"Trade placed successfully. Ticket: {result.order}")
-            open_trades[result.order] = {
-                "symbol": symbol,
-                "direction": direction,
-                "lot_size": lot_size,
-                "tp": tp,
-                "sl": sl,
-            }
-        else:
-            logging.error(f"Trade failed. Error: {result.comment}.")
+        try:
+            request = self.build_market_request(symbol, direction, lot_size, price, tp, sl)
+        except ValueError as e:
+            print(e)
+            return
+        self.send_request("market", request, "Trade failed.")
 
     def update_order(self):
         """Update an open trade's TP/SL."""
@@ -193,20 +364,8 @@ class TradingTool:
             optional=True,
         )
 
-        request = {
-            "action": mt5.TRADE_ACTION_SLTP,
-            "position": ticket,
-            "sl": sl or 0.0,
-            "tp": tp or 0.0,
-        }
-
-        result = mt5.order_send(request)
-        if result.retcode == mt5.TRADE_RETCODE_DONE:
-            logging.info(f"Order updated successfully. Ticket: {ticket}")
-            open_trades[ticket]["tp"] = tp
-            open_trades[ticket]["sl"] = sl
-        else:
-            logging.error(f"Failed to update order. Error: {result.comment}")
+        request = self.build_sltp_request(ticket, tp, sl)
+        self.send_request("update", request, "Failed to update order.")
 
     def close_order(self):
         """Close an open trade."""
@@ -220,37 +379,13 @@ class TradingTool:
             return
 
         trade = open_trades[ticket]
-        symbol = trade["symbol"]
-        tick = mt5.symbol_info_tick(symbol)
+        tick = self.get_tick(trade["symbol"])
         if not tick:
-            logging.error(f"Failed to get tick data for {symbol}.")
             return
 
         price = tick.bid if trade["direction"] == "buy" else tick.ask
-        action_type = (
-            mt5.ORDER_TYPE_SELL if trade["direction"] == "buy" else mt5.ORDER_TYPE_BUY
-        )
-
-        request = {
-            "action": mt5.TRADE_ACTION_DEAL,
-            "position": ticket,
-            "symbol": symbol,
-            "volume": trade["lot_size"],
-            "type": action_type,
-            "price": price,
-            "deviation": 20,
-            "magic": self.magic_number,
-            "comment": "Close trade",
-            "type_time": mt5.ORDER_TIME_GTC,
-            "type_filling": mt5.ORDER_FILLING_IOC,
-        }
-
-        result = mt5.order_send(request)
-        if result.retcode == mt5.TRADE_RETCODE_DONE:
-            logging.info(f"Trade closed successfully. Ticket: {ticket}")
-            del open_trades[ticket]
-        else:
-            logging.error(f"Failed to close trade. Error: {result.comment}")
+        request = self.build_close_request(ticket, trade, price)
+        self.send_request("close", request, "Failed to close trade.")
 
     def close_partial_position(self):
         """Close a portion of an open trade."""
@@ -292,41 +427,23 @@ class TradingTool:
         )
 
         trade = open_trades[ticket]
-        symbol = trade["symbol"]
-        tick = mt5.symbol_info_tick(symbol)
+        tick = self.get_tick(trade["symbol"])
         if not tick:
-            logging.error(f"Failed to get tick data for {symbol}.")
             return
 
         price = tick.bid if trade["direction"] == "buy" else tick.ask
-        action_type = (
-            mt5.ORDER_TYPE_SELL if trade["direction"] == "buy" else mt5.ORDER_TYPE_BUY
-        )
-
-        request = {
-            "action": mt5.TRADE_ACTION_DEAL,
-            "position": ticket,
-            "symbol": symbol,
-            "volume": round(trade["lot_size"] * perc_close, 2),
-            "type": action_type,
-            "price": price,
-            "deviation": 20,
-            "magic": self.magic_number,
-            "comment": "Partial close via script",
-            "type_time": mt5.ORDER_TIME_GTC,
-            "type_filling": mt5.ORDER_FILLING_IOC,
-        }
-
-        result = mt5.order_send(request)
-        if result.retcode == mt5.TRADE_RETCODE_DONE:
-            logging.info(f"Partial close successful. Ticket: {ticket}")
-            open_trades[ticket]["lot_size"] -= request["volume"]
-            if open_trades[ticket]["lot_size"] <= 0:
-                del open_trades[ticket]
-        else:
-            logging.error(
-                f"Failed to partially close position. Error: {result.comment}"
+        try:
+            request = self.build_close_request(
+                ticket,
+                trade,
+                price,
+                volume=trade["lot_size"] * perc_close,
+                comment="Partial close via script",
             )
+        except ValueError as e:
+            print(e)
+            return
+        self.send_request("close", request, "Failed to partially close position.")
 
     def show_all_open_trades(self):
         """Display all open trades."""
@@ -337,13 +454,12 @@ class TradingTool:
             for ticket, trade in open_trades.items():
                 print(
                     f"Ticket: {ticket}, Symbol: {trade['symbol']}, Lot Size: {trade['lot_size']}, "
-                    f"TP: {trade['tp']}, SL: {trade['sl']}, Type: {trade['type']}"
+                    f"TP: {trade['tp'] or None}, SL: {trade['sl'] or None}, Type: {trade['type']}"
                 )
 
     def place_pending_order(self):
         """Place a pending order."""
-        if not mt5.symbol_select(symbol, True):
-            logging.error(f"Failed to select symbol {symbol}.")
+        if self.symbols.get(symbol) is None:
             return
 
         order_type = self.validate_input(
@@ -363,41 +479,12 @@ class TradingTool:
             "Enter Stop Loss (optional, press Enter to skip): ", float, optional=True
         )
 
-        action_type = {
-            "buy_limit": mt5.ORDER_TYPE_BUY_LIMIT,
-            "sell_limit": mt5.ORDER_TYPE_SELL_LIMIT,
-            "buy_stop": mt5.ORDER_TYPE_BUY_STOP,
-            "sell_stop": mt5.ORDER_TYPE_SELL_STOP,
-        }[order_type]
-
-        request = {
-            "action": mt5.TRADE_ACTION_PENDING,
-            "symbol": symbol,
-            "volume": lot_size,
-            "type": action_type,
-            "price": price,
-            "deviation": 20,
-            "tp": float(tp) if tp else 0.0,
-            "sl": float(sl) if sl else 0.0,
-            "magic": self.magic_number,
-            "comment": "Pending order via script",
-            "type_time": mt5.ORDER_TIME_GTC,
-            "type_filling": mt5.ORDER_FILLING_IOC,
-        }
-
-        result = mt5.order_send(request)
-        if result.retcode == mt5.TRADE_RETCODE_DONE:
-            logging.info(f"Pending order placed successfully. Ticket: {result.order}")
-            pending_orders[result.order] = {
-                "symbol": symbol,
-                "type": action_type,
-                "lot_size": lot_size,
-                "price": price,
-                "tp": tp,
-                "sl": sl,
-            }
-        else:
-            logging.error(f"Failed to place pending order. Error: {result.comment}")
+        try:
+            request = self.build_pending_request(symbol, order_type, lot_size, price, tp, sl)
+        except ValueError as e:
+            print(e)
+            return
+        self.send_request("pending", request, "Failed to place pending order.")
 
     def update_pending_order(self):
         """Update a pending order's price, TP, or SL."""
@@ -424,22 +511,8 @@ class TradingTool:
             optional=True,
         )
 
-        request = {
-            "action": mt5.TRADE_ACTION_MODIFY,
-            "order": ticket,
-            "price": price,
-            "sl": sl or 0.0,
-            "tp": tp or 0.0,
-        }
-
-        result = mt5.order_send(request)
-        if result.retcode == mt5.TRADE_RETCODE_DONE:
-            logging.info(f"Pending order updated successfully. Ticket: {ticket}")
-            pending_orders[ticket]["price"] = price
-            pending_orders[ticket]["tp"] = tp
-            pending_orders[ticket]["sl"] = sl
-        else:
-            logging.error(f"Failed to update pending order. Error: {result.comment}")
+        request = self.build_modify_pending_request(ticket, price, tp, sl)
+        self.send_request("update_pending", request, "Failed to update pending order.")
 
     def remove_pending_order(self):
         """Remove a pending order."""
@@ -454,17 +527,8 @@ class TradingTool:
             print("Invalid ticket ID.")
             return
 
-        request = {
-            "action": mt5.TRADE_ACTION_REMOVE,
-            "order": ticket,
-        }
-
-        result = mt5.order_send(request)
-        if result.retcode == mt5.TRADE_RETCODE_DONE:
-            logging.info(f"Pending order removed successfully. Ticket: {ticket}")
-            del pending_orders[ticket]
-        else:
-            logging.error(f"Failed to remove pending order. Error: {result.comment}")
+        request = self.build_remove_pending_request(ticket)
+        self.send_request("remove_pending", request, "Failed to remove pending order.")
 
     def show_all_pending_trades(self):
         """Display all pending orders."""
@@ -475,13 +539,257 @@ class TradingTool:
             for ticket, order in pending_orders.items():
                 print(
                     f"Ticket: {ticket}, Symbol: {order['symbol']}, Lot Size: {order['lot_size']}, "
-                    f"Price: {order['price']}, Type: {order['type']}, TP: {order['tp']}, SL: {order['sl']}"
+                    f"Price: {order['price']}, Type: {order['type']}, TP: {order['tp'] or None}, SL: {order['sl'] or None}"
                 )
 
+    def build_intent_request(self, intent, ticks):
+        """Turn a batch order intent into an MT5 request dict.
+
+        ``ticks`` caches one tick per symbol for the whole batch. Raises
+        ValueError for intents that cannot be built.
+        """
+        op = intent["op"]
+        if op in ("market", "pending"):
+            intent_symbol = intent.get("symbol", symbol)
+            if self.symbols.get(intent_symbol) is None:
+                raise ValueError(f"Failed to load symbol {intent_symbol}.")
+        if op == "market":
+            if intent["direction"] not in ("buy", "sell"):
+                raise ValueError(f"Invalid direction {intent['direction']!r}.")
+            tick = self._batch_tick(intent_symbol, ticks)
+            price = tick.ask if intent["direction"] == "buy" else tick.bid
+            return self.build_market_request(
+                intent_symbol,
+                intent["direction"],
+                intent["lot_size"],
+                price,
+                intent.get("tp"),
+                intent.get("sl"),
+            )
+        if op == "pending":
+            if intent["order_type"] not in PENDING_ORDER_TYPES:
+                raise ValueError(f"Invalid order type {intent['order_type']!r}.")
+            return self.build_pending_request(
+                intent_symbol,
+                intent["order_type"],
+                intent["lot_size"],
+                intent["price"],
+                intent.get("tp"),
+                intent.get("sl"),
+            )
+
+        ticket = intent["ticket"]
+        if op in ("close", "update") and ticket not in open_trades:
+            raise ValueError(f"Unknown open trade {ticket}.")
+        if op in ("update_pending", "remove_pending") and ticket not in pending_orders:
+            raise ValueError(f"Unknown pending order {ticket}.")
+
+        if op == "close":
+            trade = open_trades[ticket]
+            tick = self._batch_tick(trade["symbol"], ticks)
+            price = tick.bid if trade["direction"] == "buy" else tick.ask
+            fraction = intent.get("fraction")
+            if fraction is None:
+                return self.build_close_request(ticket, trade, price)
+            return self.build_close_request(
+                ticket,
+                trade,
+                price,
+                volume=trade["lot_size"] * fraction,
+                comment="Partial close via script",
+            )
+        if op == "update":
+            return self.build_sltp_request(ticket, intent.get("tp"), intent.get("sl"))
+        if op == "update_pending":
+            return self.build_modify_pending_request(
+                ticket, intent["price"], intent.get("tp"), intent.get("sl")
+            )
+        if op == "remove_pending":
+            return self.build_remove_pending_request(ticket)
+        raise ValueError(f"Unknown operation {op!r}.")
+
+    def _batch_tick(self, tick_symbol, ticks):
+        if tick_symbol not in ticks:
+            ticks[tick_symbol] = self.get_tick(tick_symbol)
+        if not ticks[tick_symbol]:
+            raise ValueError(f"Failed to get tick data for {tick_symbol}.")
+        return ticks[tick_symbol]
+
+    def _timed_send(self, request):
+        started = time.perf_counter()
+        try:
+            result = mt5.order_send(request)
+        except Exception as e:
+            logging.error(f"order_send raised for {request}: {e}")
+            result = None
+        latency_ms = (time.perf_counter() - started) * 1000
+        if result is not None and result.retcode in SYMBOL_RETCODES and "symbol" in request:
+            self.symbols.invalidate(request["symbol"])
+        return result, latency_ms
+
+    def submit_requests(self, jobs, max_workers=4):
+        """Send ``(op, request)`` pairs through a bounded worker pool.
+
+        Returns ``(result, latency_ms)`` pairs in the order of ``jobs``.
+        """
+        if not jobs:
+            return []
+        workers = max(1, min(max_workers, len(jobs)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(self._timed_send, [request for _, request in jobs]))
+
+    def execute_batch(self, intents, max_workers=4):
+        """Execute order intents without prompting and report each outcome.
+
+        Each intent is a dict with an ``op`` of "market", "close", "update",
+        "pending", "update_pending" or "remove_pending" plus the fields the
+        matching interactive method would prompt for, e.g.
+        ``{"op": "close", "ticket": 123}`` or
+        ``{"op": "market", "symbol": "BTCUSD", "direction": "buy", "lot_size": 0.01}``.
+        Close intents accept an optional ``fraction`` for partial closes.
+
+        Returns one result dict per intent, in order, with the ticket,
+        retcode, comment and order_send latency in milliseconds.
+        """
+        started = time.perf_counter()
+        ticks = {}
+        results = [None] * len(intents)
+        jobs = []
+        positions = []
+        for i, intent in enumerate(intents):
+            try:
+                request = self.build_intent_request(intent, ticks)
+            except (KeyError, ValueError) as e:
+                results[i] = {
+                    "op": intent.get("op"),
+                    "ticket": intent.get("ticket"),
+                    "ok": False,
+                    "retcode": None,
+                    "comment": str(e),
+                    "order": None,
+                    "latency_ms": 0.0,
+                    "request": None,
+                }
+                continue
+            jobs.append((intent["op"], request))
+            positions.append(i)
+
+        for i, (op, request), (result, latency_ms) in zip(
+            positions, jobs, self.submit_requests(jobs, max_workers)
+        ):
+            ok = result is not None and result.retcode == mt5.TRADE_RETCODE_DONE
+            if ok:
+                self.record_result(op, request, result)
+            results[i] = {
+                "op": op,
+                "ticket": intents[i].get("ticket", result.order if ok else None),
+                "ok": ok,
+                "retcode": result.retcode if result is not None else None,
+                "comment": result.comment if result is not None else str(mt5.last_error()),
+                "order": result.order if result is not None else None,
+                "latency_ms": latency_ms,
+                "request": request,
+            }
+
+        succeeded = sum(1 for r in results if r["ok"])
+        logging.info(
+            f"Batch executed: {succeeded}/{len(intents)} succeeded in "
+            f"{(time.perf_counter() - started) * 1000:.1f} ms."
+        )
+        return results
+
+    def flatten(self, symbol=None, magic=None, max_retries=3, max_workers=4):
+        """Close every open trade, optionally filtered by symbol and/or magic.
+
+        Trades are grouped by symbol so each round fetches a single tick per
+        symbol. Closes rejected with a requote or price change are retried
+        with fresh prices up to ``max_retries`` times.
+
+        Returns a report with the closed tickets, failures and time-to-flat.
+        """
+        started = time.perf_counter()
+        remaining = [
+            ticket
+            for ticket, trade in open_trades.items()
+            if (symbol is None or trade["symbol"] == symbol)
+            and (magic is None or trade.get("magic") == magic)
+        ]
+        report = {"closed": [], "failed": {}, "rounds": 0, "time_to_flat_ms": 0.0}
+
+        while remaining and report["rounds"] <= max_retries:
+            report["rounds"] += 1
+            by_symbol = {}
+            for ticket in remaining:
+                by_symbol.setdefault(open_trades[ticket]["symbol"], []).append(ticket)
+
+            jobs = []
+            for trade_symbol, tickets in by_symbol.items():
+                # Retry rounds follow requotes: bypass the feed's buffered quote
+                tick = self.get_tick(trade_symbol, fresh=report["rounds"] > 1)
+                if not tick:
+                    for ticket in tickets:
+                        report["failed"][ticket] = f"No tick data for {trade_symbol}"
+                    continue
+                for ticket in tickets:
+                    trade = open_trades[ticket]
+                    price = tick.bid if trade["direction"] == "buy" else tick.ask
+                    jobs.append(
+                        ("close", self.build_close_request(ticket, trade, price))
+                    )
+
+            remaining = []
+            for (op, request), (result, _) in zip(
+                jobs, self.submit_requests(jobs, max_workers)
+            ):
+                ticket = request["position"]
+                if result is not None and result.retcode == mt5.TRADE_RETCODE_DONE:
+                    self.record_result(op, request, result)
+                    report["closed"].append(ticket)
+                    report["failed"].pop(ticket, None)
+                elif result is not None and result.retcode in REQUOTE_RETCODES:
+                    report["failed"][ticket] = result.comment
+                    remaining.append(ticket)
+                else:
+                    report["failed"][ticket] = (
+                        result.comment if result is not None else str(mt5.last_error())
+                    )
+
+        report["time_to_flat_ms"] = (time.perf_counter() - started) * 1000
+        logging.info(
+            f"Flatten finished: {len(report['closed'])} closed, {len(report['failed'])} failed "
+            f"in {report['rounds']} round(s), {report['time_to_flat_ms']:.1f} ms to flat."
+        )
+        return report
+
+    def flatten_positions(self):
+        """Close all open trades, or only those of one symbol or magic number."""
+        if not open_trades:
+            print("No open trades to close.")
+            return
+
+        filter_symbol = self.validate_input(
+            "Enter symbol to close (optional, press Enter for all): ",
+            str,
+            optional=True,
+        )
+        filter_magic = self.validate_input(
+            "Enter magic number to close (optional, press Enter for all): ",
+            int,
+            optional=True,
+        )
+
+        report = self.flatten(filter_symbol, filter_magic)
+        print(
+            f"Closed {len(report['closed'])} trade(s) in {report['time_to_flat_ms']:.0f} ms."
+        )
+        for ticket, comment in report["failed"].items():
+            print(f"Failed to close {ticket}: {comment}")
+
     def main(self):
         """Main menu for the trading tool."""
         self.connect_to_account()
         self.initialize_trade_tracking()
+        self.start_tick_feed()
 
         while True:
             print("\n--- MT5 Trading Tool Menu ---")
@@ -494,43 +802,50 @@ class TradingTool:
             print("7. Update Pending Order")
             print("8. Remove Pending Order")
             print("9. Show All Pending Orders")
+            print("10. Flatten Positions")
             print("0. Exit")
 
             choice = self.validate_input(
                 "Enter your choice: ",
                 str,
-                values=["1", "2", "3", "4", "5", "6", "7", "8", "9", "0"],
+                values=["1", "2", "3", "4", "5", "6", "7", "8", "9", "10", "0"],
             )
 
             if choice == "1":
-                self.initialize_trade_tracking()
+                self.refresh_trade_tracking()
                 self.place_order()
             elif choice == "2":
-                self.initialize_trade_tracking()
+                self.refresh_trade_tracking()
                 self.update_order()
             elif choice == "3":
-                self.initialize_trade_tracking()
+                self.refresh_trade_tracking()
                 self.close_order()
             elif choice == "4":
-                self.initialize_trade_tracking()
+                self.refresh_trade_tracking()
                 self.close_partial_position()
             elif choice == "5":
-                self.initialize_trade_tracking()
+                self.refresh_trade_tracking()
                 self.show_all_open_trades()
             elif choice == "6":
-                self.initialize_trade_tracking()
+                self.refresh_trade_tracking()
                 self.place_pending_order()
             elif choice == "7":
-                self.initialize_trade_tracking()
+                self.refresh_trade_tracking()
                 self.update_pending_order()
             elif choice == "8":
-                self.initialize_trade_tracking()
+                self.refresh_trade_tracking()
                 self.remove_pending_order()
             elif choice == "9":
-                self.initialize_trade_tracking()
+                self.refresh_trade_tracking()
                 self.show_all_pending_trades()
+            elif choice == "10":
+                self.refresh_trade_tracking()
+                self.flatten_positions()
             elif choice == "0":
                 print("Exiting the program. Goodbye!")
+                self.tick_feed.stop()
+                if self.copier:
+                    self.copier.stop()
                 mt5.shutdown()
                 sys.exit(0)
             else:
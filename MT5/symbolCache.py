@@ -0,0 +1,119 @@
+import logging
+import math
+import time
+
+
+def _decimals(step):
+    """Number of decimals needed to represent a volume/price step."""
+    text = f"{step:.10f}".rstrip("0")
+    return len(text.split(".")[1]) if "." in text else 0
+
+
+class SymbolCache:
+    """Per-symbol trading metadata fetched once from ``symbol_info``.
+
+    Entries hold the volume limits and step, digits, tick size and the
+    filling mode to use, and are refreshed after ``ttl`` seconds or when
+    invalidated (e.g. after the server rejects a volume or filling). The
+    symbol is only selected in Market Watch when it is not visible yet.
+    """
+
+    def __init__(self, terminal, ttl=300.0):
+        self.terminal = terminal
+        self.ttl = ttl
+        self._entries = {}
+
+    def get(self, symbol):
+        """Return cached metadata for a symbol, loading it if needed."""
+        entry = self._entries.get(symbol)
+        if entry and time.monotonic() - entry["loaded"] < self.ttl:
+            return entry
+
+        info = self.terminal.symbol_info(symbol)
+        if info is None:
+            logging.error(f"Failed to get symbol info for {symbol}.")
+            return None
+        if not info.visible and not self.terminal.symbol_select(symbol, True):
+            logging.error(f"Failed to select symbol {symbol}.")
+            return None
+
+        tick_size = info.trade_tick_size or info.point
+        entry = {
+            "volume_min": info.volume_min,
+            "volume_step": info.volume_step,
+            "volume_max": info.volume_max,
+            "volume_digits": _decimals(info.volume_step),
+            "digits": info.digits,
+            "tick_size": tick_size,
+            "filling_modes": info.filling_mode,
+            "filling": self._pick_filling(info.filling_mode),
+            "loaded": time.monotonic(),
+        }
+        self._entries[symbol] = entry
+        return entry
+
+    def invalidate(self, symbol=None):
+        """Drop one symbol's metadata, or everything when no symbol is given."""
+        if symbol is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(symbol, None)
+
+    def _pick_filling(self, filling_modes):
+        # IOC stays the default, as before the cache existed, when the symbol allows it
+        if filling_modes & self.terminal.SYMBOL_FILLING_IOC:
+            return self.terminal.ORDER_FILLING_IOC
+        if filling_modes & self.terminal.SYMBOL_FILLING_FOK:
+            return self.terminal.ORDER_FILLING_FOK
+        return self.terminal.ORDER_FILLING_RETURN
+
+    def filling(self, symbol):
+        """Filling mode accepted by the symbol."""
+        entry = self.get(symbol)
+        return entry["filling"] if entry else self.terminal.ORDER_FILLING_IOC
+
+    def _floor_volume(self, entry, volume):
+        steps = math.floor(volume / entry["volume_step"] + 1e-9)
+        return round(steps * entry["volume_step"], entry["volume_digits"])
+
+    def normalize_volume(self, symbol, volume):
+        """Round an order volume down to the symbol's step.
+
+        Raises ValueError when the result falls outside the symbol's
+        min/max instead of silently resizing the order.
+        """
+        entry = self.get(symbol)
+        if not entry:
+            return volume
+        normalized = self._floor_volume(entry, volume)
+        if (
+            normalized < entry["volume_min"] - 1e-9
+            or normalized > entry["volume_max"] + 1e-9
+        ):
+            raise ValueError(
+                f"Volume {volume} for {symbol} is outside "
+                f"{entry['volume_min']}-{entry['volume_max']}."
+            )
+        return normalized
+
+    def close_volume(self, symbol, volume, open_volume):
+        """Round a partial close down to the step, at most ``open_volume``.
+
+        Never rounds up, so a small partial close cannot turn into a full
+        one; returns None when the result is below the symbol's minimum.
+        """
+        entry = self.get(symbol)
+        if not entry:
+            return min(volume, open_volume)
+        volume = min(self._floor_volume(entry, volume), open_volume)
+        return volume if volume >= entry["volume_min"] - 1e-9 else None
+
+    def normalize_price(self, symbol, price):
+        """Round a price to the symbol's tick size and digits."""
+        if not price:
+            return price
+        entry = self.get(symbol)
+        if not entry:
+            return price
+        tick_size = entry["tick_size"]
+        return round(round(price / tick_size) * tick_size, entry["digits"])
@@ -0,0 +1,180 @@
+import logging
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+TICK_DTYPE = np.dtype(
+    [
+        ("time_msc", "i8"),
+        ("bid", "f8"),
+        ("ask", "f8"),
+        ("last", "f8"),
+        ("volume", "f8"),
+    ]
+)
+
+Tick = namedtuple("Tick", ["time_msc", "bid", "ask", "last", "volume"])
+
+
+class TickRingBuffer:
+    """Fixed-size, preallocated tick store that overwrites the oldest ticks."""
+
+    def __init__(self, capacity=10000):
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=TICK_DTYPE)
+        self._written = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return min(self._written, self.capacity)
+
+    def extend(self, ticks):
+        """Append ticks from a ``copy_ticks_*`` structured array."""
+        count = len(ticks)
+        if not count:
+            return
+        if count > self.capacity:
+            ticks = ticks[-self.capacity :]
+        with self._lock:
+            idx = (self._written + np.arange(len(ticks))) % self.capacity
+            for field in TICK_DTYPE.names:
+                self._data[field][idx] = ticks[field]
+            self._written += count
+
+    def latest(self):
+        """Most recent tick, or None when empty."""
+        with self._lock:
+            if not self._written:
+                return None
+            return Tick(*self._data[(self._written - 1) % self.capacity].item())
+
+    def last_n(self, n):
+        """Copy of the last ``n`` ticks, oldest first."""
+        with self._lock:
+            n = min(n, len(self))
+            idx = (self._written - n + np.arange(n)) % self.capacity
+            return self._data[idx]
+
+
+class TickFeed:
+    """Background poller that keeps recent ticks of some symbols in memory.
+
+    Each poll pulls every tick since the last one seen with a single
+    ``copy_ticks_from`` call per symbol, so order code can read the current
+    bid/ask from memory instead of calling ``symbol_info_tick``. ``tick()``
+    returns None once the feed has not caught up with a symbol for
+    ``max_age`` seconds, letting callers fall back to the terminal.
+    """
+
+    def __init__(
+        self, terminal, symbols, capacity=10000, interval=0.05, batch=1000, max_age=2.0
+    ):
+        self.terminal = terminal
+        self.symbols = list(symbols)
+        self.interval = interval
+        self.batch = batch
+        self.max_age = max_age
+        self.buffers = {s: TickRingBuffer(capacity) for s in self.symbols}
+        self._last_msc = {}
+        self._seen_at_last = {}
+        self._polled = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start polling in a daemon thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="tick-feed", daemon=True)
+        self._thread.start()
+        logging.info(f"Tick feed started for {', '.join(self.symbols)}.")
+
+    def stop(self):
+        """Stop the polling thread."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                logging.error(f"Tick feed poll failed: {e}")
+            self._stop.wait(self.interval)
+
+    def poll(self):
+        """Pull new ticks for every symbol once; returns the number stored."""
+        return sum(self._poll_symbol(s) for s in self.symbols)
+
+    def _poll_symbol(self, symbol):
+        if symbol not in self._last_msc:
+            tick = self.terminal.symbol_info_tick(symbol)
+            if not tick:
+                logging.error(f"Failed to get tick data for {symbol}.")
+                return 0
+            self._last_msc[symbol] = tick.time_msc
+            self._seen_at_last[symbol] = 0
+
+        stored = 0
+        count = self.batch
+        while True:
+            last_msc = self._last_msc[symbol]
+            ticks = self.terminal.copy_ticks_from(
+                symbol, last_msc // 1000, count, self.terminal.COPY_TICKS_ALL
+            )
+            if ticks is None:
+                # Not caught up: leave the feed to go stale so readers fall back
+                logging.error(
+                    f"Failed to copy ticks for {symbol}: {self.terminal.last_error()}"
+                )
+                return stored
+
+            # Ticks from the start of last_msc's second were partly seen already
+            msc = ticks["time_msc"]
+            first = np.searchsorted(msc, last_msc, side="left")
+            same = np.searchsorted(msc, last_msc, side="right") - first
+            new = ticks[first + min(same, self._seen_at_last[symbol]) :]
+            if len(new):
+                self.buffers[symbol].extend(new)
+                stored += len(new)
+                newest = int(new["time_msc"][-1])
+                self._seen_at_last[symbol] = int(np.count_nonzero(msc == newest))
+                self._last_msc[symbol] = newest
+            if len(ticks) < count:
+                break
+            # Full batch: read on, asking for more when it held only ticks seen already
+            count = self.batch if len(new) else count * 2
+
+        self._polled[symbol] = time.monotonic()
+        return stored
+
+    def tick(self, symbol):
+        """Latest in-memory tick, or None if the symbol's data is stale."""
+        polled = self._polled.get(symbol)
+        if polled is None or time.monotonic() - polled > self.max_age:
+            return None
+        return self.buffers[symbol].latest()
+
+    def last_n(self, symbol, n):
+        """The last ``n`` ticks of a symbol as a structured array."""
+        return self.buffers[symbol].last_n(n)
+
+
+def compare_latency(terminal, feed, symbol, n=1000):
+    """Average microseconds per quote: ``symbol_info_tick`` vs. the feed."""
+    started = time.perf_counter()
+    for _ in range(n):
+        terminal.symbol_info_tick(symbol)
+    direct = (time.perf_counter() - started) / n * 1e6
+
+    started = time.perf_counter()
+    for _ in range(n):
+        feed.tick(symbol)
+    cached = (time.perf_counter() - started) / n * 1e6
+
+    return {"direct_us": direct, "feed_us": cached, "speedup": direct / cached}
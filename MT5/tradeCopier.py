@@ -0,0 +1,379 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from symbolCache import SymbolCache
+from tradeSync import TradeSync
+
+LAG_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+class LagHistogram:
+    """Bucketed copy-lag histogram (ms) with percentiles over recent samples."""
+
+    def __init__(self, buckets=LAG_BUCKETS_MS, recent=10000):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.samples = deque(maxlen=recent)
+        self.lock = threading.Lock()
+
+    def record(self, lag_ms):
+        with self.lock:
+            self.counts[bisect_left(self.buckets, lag_ms)] += 1
+            self.total += lag_ms
+            self.samples.append(lag_ms)
+
+    def snapshot(self):
+        """Bucket counts plus count, mean and p50/p95/p99 of recent samples."""
+        with self.lock:
+            counts = list(self.counts)
+            total = self.total
+            samples = sorted(self.samples)
+        count = sum(counts)
+        labels = [f"<={b}" for b in self.buckets] + [f">{self.buckets[-1]}"]
+
+        def percentile(q):
+            if not samples:
+                return None
+            return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+        return {
+            "count": count,
+            "mean_ms": total / count if count else None,
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+            "buckets": dict(zip(labels, counts)),
+        }
+
+
+class Follower:
+    """A follower terminal plus how master trades map onto it.
+
+    ``terminal`` is any object exposing the MetaTrader5 API; the package
+    drives a single terminal per process, so followers beyond that are
+    bridges to other processes (or fakes in tests). Volumes are the master
+    lot times ``volume_scale`` (or ``fixed_volume``), normalized to the
+    follower symbol's step, and ``symbol_map`` renames master symbols,
+    e.g. ``{"XAUUSD": "XAUUSDm"}``. A partial close on the master shrinks
+    the copy to the volume for the master's remaining lots, so fixed-volume
+    copies only close when the master position does.
+    """
+
+    def __init__(
+        self,
+        terminal,
+        name,
+        volume_scale=1.0,
+        fixed_volume=None,
+        symbol_map=None,
+        copy_sltp=True,
+        magic=54321,
+        deviation=20,
+        max_retries=3,
+    ):
+        self.terminal = terminal
+        self.name = name
+        self.volume_scale = volume_scale
+        self.fixed_volume = fixed_volume
+        self.symbol_map = symbol_map or {}
+        self.copy_sltp = copy_sltp
+        self.magic = magic
+        self.deviation = deviation
+        self.max_retries = max_retries
+        self.symbols = SymbolCache(terminal)
+        # Master position ticket -> the follower position copying it
+        self.links = {}
+
+    def load_links(self):
+        """Re-link follower positions opened by an earlier run, via their comment."""
+        for pos in self.terminal.positions_get() or []:
+            comment = getattr(pos, "comment", "") or ""
+            if pos.magic == self.magic and comment.startswith("copy "):
+                try:
+                    master_ticket = int(comment[5:])
+                except ValueError:
+                    logging.warning(
+                        f"Skipping position {pos.ticket} on {self.name}: "
+                        f"unrecognised copy comment {comment!r}."
+                    )
+                    continue
+                self.links[master_ticket] = {
+                    "ticket": pos.ticket,
+                    "symbol": pos.symbol,
+                    "direction": "buy" if pos.type == self.terminal.ORDER_TYPE_BUY else "sell",
+                    "lot_size": pos.volume,
+                }
+        return len(self.links)
+
+    def volume_for(self, symbol, master_lot):
+        volume = self.fixed_volume if self.fixed_volume else master_lot * self.volume_scale
+        return self.symbols.normalize_volume(symbol, volume)
+
+    def _send_deal(self, request, direction):
+        """Send a market request at the current price, retrying requotes."""
+        terminal = self.terminal
+        requotes = (terminal.TRADE_RETCODE_REQUOTE, terminal.TRADE_RETCODE_PRICE_CHANGED)
+        for _ in range(self.max_retries + 1):
+            tick = terminal.symbol_info_tick(request["symbol"])
+            if not tick:
+                return None
+            request["price"] = tick.ask if direction == "buy" else tick.bid
+            result = terminal.order_send(request)
+            if result is None or result.retcode not in requotes:
+                return result
+        return result
+
+    def open(self, master_ticket, entry):
+        symbol = self.symbol_map.get(entry["symbol"], entry["symbol"])
+        terminal = self.terminal
+        buy = entry["direction"] == "buy"
+        tp = self.symbols.normalize_price(symbol, entry["tp"]) if self.copy_sltp else None
+        sl = self.symbols.normalize_price(symbol, entry["sl"]) if self.copy_sltp else None
+        request = {
+            "action": terminal.TRADE_ACTION_DEAL,
+            "symbol": symbol,
+            "volume": self.volume_for(symbol, entry["lot_size"]),
+            "type": terminal.ORDER_TYPE_BUY if buy else terminal.ORDER_TYPE_SELL,
+            "deviation": self.deviation,
+            "tp": tp or 0.0,
+            "sl": sl or 0.0,
+            "magic": self.magic,
+            "comment": f"copy {master_ticket}",
+            "type_time": terminal.ORDER_TIME_GTC,
+            "type_filling": self.symbols.filling(symbol),
+        }
+        result = self._send_deal(request, entry["direction"])
+        if result is not None and result.retcode == terminal.TRADE_RETCODE_DONE:
+            self.links[master_ticket] = {
+                "ticket": result.order,
+                "symbol": symbol,
+                "direction": entry["direction"],
+                "lot_size": request["volume"],
+            }
+        return result
+
+    def close_volume_for(self, master_ticket, master_lot):
+        """Volume to close so the copy tracks the master's remaining ``master_lot``.
+
+        The target is ``volume_for`` the remaining lots (or the symbol's
+        minimum when that is too small to copy) and only the difference is
+        closed, rounded down. None when the difference is below the
+        symbol's minimum volume.
+        """
+        link = self.links[master_ticket]
+        try:
+            target = self.volume_for(link["symbol"], master_lot)
+        except ValueError:
+            target = self.symbols.get(link["symbol"])["volume_min"]
+        if target >= link["lot_size"]:
+            return None
+        return self.symbols.close_volume(
+            link["symbol"], link["lot_size"] - target, link["lot_size"]
+        )
+
+    def close(self, master_ticket, volume=None):
+        """Close ``volume`` of the copy, or all of it."""
+        link = self.links[master_ticket]
+        terminal = self.terminal
+        if volume is None:
+            volume = link["lot_size"]
+        direction = "sell" if link["direction"] == "buy" else "buy"
+        request = {
+            "action": terminal.TRADE_ACTION_DEAL,
+            "position": link["ticket"],
+            "symbol": link["symbol"],
+            "volume": volume,
+            "type": terminal.ORDER_TYPE_SELL if direction == "sell" else terminal.ORDER_TYPE_BUY,
+            "deviation": self.deviation,
+            "magic": self.magic,
+            "comment": f"copy {master_ticket}",
+            "type_time": terminal.ORDER_TIME_GTC,
+            "type_filling": self.symbols.filling(link["symbol"]),
+        }
+        result = self._send_deal(request, direction)
+        if result is not None and result.retcode == terminal.TRADE_RETCODE_DONE:
+            link["lot_size"] = round(link["lot_size"] - volume, 8)
+            if link["lot_size"] <= 0:
+                del self.links[master_ticket]
+        return result
+
+    def update_sltp(self, master_ticket, entry):
+        link = self.links[master_ticket]
+        return self.terminal.order_send(
+            {
+                "action": self.terminal.TRADE_ACTION_SLTP,
+                "position": link["ticket"],
+                "sl": self.symbols.normalize_price(link["symbol"], entry["sl"]) or 0.0,
+                "tp": self.symbols.normalize_price(link["symbol"], entry["tp"]) or 0.0,
+            }
+        )
+
+
+class TradeCopier:
+    """Copy master positions onto follower terminals as they change.
+
+    The master is polled with ``TradeSync`` and every position added,
+    modified or removed is turned into follower actions: open, partial or
+    full close, and SL/TP updates. Each poll's actions are dispatched to
+    all followers in parallel (one worker per follower, so a follower's
+    actions keep their order). ``full_sync_interval`` is passed to
+    ``TradeSync`` as ``max_age``: at 0 every poll diffs full snapshots,
+    which also catches SL/TP edits immediately.
+
+    Copy lag is recorded per follower and event type, from the start of
+    the poll that observed the master change to the follower's
+    confirmation; detection adds up to one ``interval`` on top.
+    """
+
+    def __init__(
+        self,
+        master,
+        followers,
+        interval=0.01,
+        full_sync_interval=0.0,
+        magic=None,
+        copy_existing=False,
+    ):
+        self.master = master
+        self.followers = list(followers)
+        self.interval = interval
+        self.magic = magic
+        self.copy_existing = copy_existing
+        self.sync = TradeSync(master, max_age=full_sync_interval)
+        self.lag = {}
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._previous = {}
+        self._actions = []
+        self._pool = ThreadPoolExecutor(max_workers=max(1, len(self.followers)))
+        self._stop = threading.Event()
+        self._thread = None
+        self._primed = False
+
+    def prime(self):
+        """Take the first master snapshot and restore links to earlier copies."""
+        for follower in self.followers:
+            restored = follower.load_links()
+            if restored:
+                logging.info(f"Restored {restored} copied positions on {follower.name}.")
+        if not self.copy_existing:
+            # Positions open before start-up are not copied
+            self.sync.sync(force=True)
+            self._previous = dict(self.sync.open_trades)
+        self.sync.subscribe(self._on_event)
+        self._primed = True
+
+    def _on_event(self, event, kind, ticket, entry, raw):
+        if kind != "position":
+            return
+        if self.magic is not None and entry.get("magic") != self.magic:
+            return
+        previous = self._previous.get(ticket)
+        if event == "added":
+            self._previous[ticket] = dict(entry)
+            self._actions.append(("open", ticket, entry))
+        elif event == "removed":
+            self._previous.pop(ticket, None)
+            self._actions.append(("close", ticket, entry))
+        elif event == "modified" and previous is not None:
+            self._previous[ticket] = dict(entry)
+            if entry["lot_size"] < previous["lot_size"]:
+                self._actions.append(("partial_close", ticket, entry))
+            elif entry["lot_size"] > previous["lot_size"]:
+                logging.warning(f"Master position {ticket} grew; volume increases are not copied.")
+            if (entry["tp"], entry["sl"]) != (previous["tp"], previous["sl"]):
+                self._actions.append(("sltp", ticket, entry))
+
+    def _run_actions(self, follower, actions, started):
+        results = []
+        for action, ticket, entry in actions:
+            if action != "open" and ticket not in follower.links:
+                continue  # the master position was never copied here
+            if action == "sltp" and not follower.copy_sltp:
+                continue
+            try:
+                if action == "open":
+                    result = follower.open(ticket, entry)
+                elif action == "sltp":
+                    result = follower.update_sltp(ticket, entry)
+                elif action == "partial_close":
+                    volume = follower.close_volume_for(ticket, entry["lot_size"])
+                    if volume is None:
+                        continue  # the reduction is below the follower's minimum
+                    result = follower.close(ticket, volume)
+                else:
+                    result = follower.close(ticket)
+            except Exception as e:
+                logging.error(f"Copying {action} of {ticket} to {follower.name} raised: {e}")
+                result = None
+            ok = result is not None and result.retcode == follower.terminal.TRADE_RETCODE_DONE
+            lag_ms = (time.perf_counter() - started) * 1000
+            if ok:
+                self._histogram(follower.name, action).record(lag_ms)
+            else:
+                with self._lock:
+                    self.errors += 1
+                comment = result.comment if result is not None else follower.terminal.last_error()
+                logging.error(f"Failed to copy {action} of {ticket} to {follower.name}: {comment}")
+            results.append(
+                {
+                    "follower": follower.name,
+                    "action": action,
+                    "ticket": ticket,
+                    "ok": ok,
+                    "lag_ms": lag_ms,
+                }
+            )
+        return results
+
+    def _histogram(self, follower, action):
+        with self._lock:
+            return self.lag.setdefault((follower, action), LagHistogram())
+
+    def poll(self):
+        """Diff the master once and copy what changed; returns per-action results."""
+        if not self._primed:
+            self.prime()
+        started = time.perf_counter()
+        self._actions = []
+        self.sync.sync()
+        actions, self._actions = self._actions, []
+        if not actions:
+            return []
+        futures = [
+            self._pool.submit(self._run_actions, follower, actions, started)
+            for follower in self.followers
+        ]
+        return [r for future in futures for r in future.result()]
+
+    def run(self):
+        while not self._stop.is_set():
+            started = time.perf_counter()
+            try:
+                self.poll()
+            except Exception as e:
+                logging.error(f"Trade copier poll failed: {e}")
+            self._stop.wait(max(0.0, self.interval - (time.perf_counter() - started)))
+
+    def start(self):
+        """Run the copier on a background thread."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run, name="trade-copier", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def lag_report(self):
+        """Copy-lag histogram snapshot per (follower, action)."""
+        return {f"{follower}/{action}": h.snapshot() for (follower, action), h in self.lag.items()}
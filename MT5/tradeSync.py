@@ -0,0 +1,136 @@
+import logging
+import time
+from datetime import datetime, timedelta
+
+
+def position_entry(terminal, pos):
+    """Build the tracked entry for an open position."""
+    return {
+        "symbol": pos.symbol,
+        "direction": "buy" if pos.type == terminal.ORDER_TYPE_BUY else "sell",
+        "lot_size": pos.volume,
+        "tp": pos.tp,
+        "sl": pos.sl,
+        "type": pos.type,
+        "magic": pos.magic,
+    }
+
+
+def order_entry(terminal, order):
+    """Build the tracked entry for a pending order."""
+    return {
+        "symbol": order.symbol,
+        "lot_size": order.volume_current,
+        "price": order.price_open,
+        "tp": order.tp,
+        "sl": order.sl,
+        "type": order.type,
+    }
+
+
+class TradeSync:
+    """Keep open trade / pending order dicts in step with the terminal.
+
+    Snapshots from ``positions_get()`` and ``orders_get()`` are diffed by
+    ticket and only added, removed or modified entries are touched. Before
+    pulling snapshots a cheap change signature (position/order counts,
+    balance, margin and the number of deals since start-up) is compared
+    with the previous one; if nothing moved the refresh is skipped. Changes
+    that do not touch the signature (e.g. SL/TP edited from another
+    terminal) are picked up by the forced refresh every ``max_age`` seconds.
+    """
+
+    def __init__(self, terminal, open_trades=None, pending_orders=None, max_age=30.0):
+        self.terminal = terminal
+        self.open_trades = open_trades if open_trades is not None else {}
+        self.pending_orders = pending_orders if pending_orders is not None else {}
+        self.max_age = max_age
+        self.listeners = []
+        self._since = datetime.now() - timedelta(days=1)
+        self._signature = None
+        self._last_full = 0.0
+
+    def subscribe(self, callback):
+        """Register ``callback(event, kind, ticket, entry, raw)`` for changes.
+
+        ``event`` is "added", "removed" or "modified", ``kind`` is "position"
+        or "order" and ``raw`` is the terminal record (None on removal).
+        """
+        self.listeners.append(callback)
+
+    def change_signature(self):
+        """Return a cheap fingerprint of the account's trading state."""
+        account = self.terminal.account_info()
+        return (
+            self.terminal.positions_total(),
+            self.terminal.orders_total(),
+            account.balance if account else None,
+            account.margin if account else None,
+            self.terminal.history_deals_total(
+                self._since, datetime.now() + timedelta(days=1)
+            ),
+        )
+
+    def sync(self, force=False):
+        """Refresh tracked state and return the changes that were applied."""
+        changes = {
+            "skipped": False,
+            "positions": {"added": [], "removed": [], "modified": []},
+            "orders": {"added": [], "removed": [], "modified": []},
+        }
+
+        signature = self.change_signature()
+        stale = time.monotonic() - self._last_full >= self.max_age
+        if not force and not stale and signature == self._signature:
+            changes["skipped"] = True
+            return changes
+
+        positions = self.terminal.positions_get() or []
+        orders = self.terminal.orders_get() or []
+        self._signature = signature
+        self._last_full = time.monotonic()
+
+        self._apply(
+            "position", positions, self.open_trades, position_entry, changes["positions"]
+        )
+        self._apply(
+            "order", orders, self.pending_orders, order_entry, changes["orders"]
+        )
+
+        if any(changes["positions"].values()) or any(changes["orders"].values()):
+            logging.info(
+                f"Synced trades: {len(self.open_trades)} open, {len(self.pending_orders)} pending "
+                f"(positions +{len(changes['positions']['added'])}/-{len(changes['positions']['removed'])}"
+                f"/~{len(changes['positions']['modified'])}, orders +{len(changes['orders']['added'])}"
+                f"/-{len(changes['orders']['removed'])}/~{len(changes['orders']['modified'])})."
+            )
+        return changes
+
+    def _apply(self, kind, records, tracked, build_entry, events):
+        """Diff ``records`` against ``tracked`` by ticket and update in place."""
+        seen = set()
+        for record in records:
+            ticket = record.ticket
+            seen.add(ticket)
+            entry = build_entry(self.terminal, record)
+            current = tracked.get(ticket)
+            if current is None:
+                tracked[ticket] = entry
+                events["added"].append(ticket)
+                self._notify("added", kind, ticket, entry, record)
+            elif current != entry:
+                tracked[ticket] = entry
+                events["modified"].append(ticket)
+                self._notify("modified", kind, ticket, entry, record)
+
+        for ticket in [t for t in tracked if t not in seen]:
+            entry = tracked.pop(ticket)
+            events["removed"].append(ticket)
+            self._notify("removed", kind, ticket, entry, None)
+
+    def _notify(self, event, kind, ticket, entry, raw):
+        for callback in self.listeners:
+            try:
+                callback(event, kind, ticket, entry, raw)
+            except Exception as e:
+                logging.error(f"Trade sync listener failed on {event} {kind} {ticket}: {e}")
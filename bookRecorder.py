@@ -0,0 +1,166 @@
+import json
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+
+from localOrderBook import fetch_snapshot
+from orderBook import parse_order_book
+
+TIMESTAMPS_FILE = "timestamps.i8"
+BIDS_FILE = "bids.f8"
+ASKS_FILE = "asks.f8"
+META_FILE = "meta.json"
+
+
+class BookRecorder:
+    """Append order book snapshots to flat, memory-mappable files.
+
+    A recording directory holds ``timestamps.i8`` (int64 epoch ms) and
+    ``bids.f8``/``asks.f8`` (float64, ``depth`` x [price, qty] per snapshot,
+    NaN-padded when a side has fewer levels). Snapshots are staged in
+    preallocated arrays of ``flush_every`` rows, so memory stays bounded
+    however long the recording runs.
+    """
+
+    def __init__(self, path, depth=100, flush_every=100):
+        self.path = path
+        self.flush_every = flush_every
+        os.makedirs(path, exist_ok=True)
+
+        meta_path = os.path.join(path, META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                depth = json.load(f)["depth"]
+        else:
+            with open(meta_path, "w") as f:
+                json.dump({"depth": depth}, f)
+        self.depth = depth
+        self._reconcile()
+
+        reader = BookReader(path)
+        self.last_timestamp = int(reader.timestamps[-1]) if len(reader) else None
+
+        self._timestamps = np.empty(flush_every, dtype=np.int64)
+        self._bids = np.empty((flush_every, depth, 2), dtype=np.float64)
+        self._asks = np.empty((flush_every, depth, 2), dtype=np.float64)
+        self._pending = 0
+
+    def _reconcile(self):
+        """Cut the files back to the last complete snapshot.
+
+        A flush interrupted part way leaves extra bid/ask rows or a partial
+        row; appending after them would misalign every later snapshot.
+        """
+        sizes = {
+            TIMESTAMPS_FILE: np.dtype(np.int64).itemsize,
+            BIDS_FILE: np.dtype(np.float64).itemsize * self.depth * 2,
+            ASKS_FILE: np.dtype(np.float64).itemsize * self.depth * 2,
+        }
+        paths = {name: os.path.join(self.path, name) for name in sizes}
+        rows = min(
+            os.path.getsize(paths[name]) // size if os.path.exists(paths[name]) else 0
+            for name, size in sizes.items()
+        )
+        for name, size in sizes.items():
+            if os.path.exists(paths[name]) and os.path.getsize(paths[name]) != rows * size:
+                logging.warning(f"Truncating {paths[name]} to {rows} complete snapshots.")
+                os.truncate(paths[name], rows * size)
+
+    def record(self, timestamp_ms, bids, asks):
+        """Stage one snapshot; bids/asks are (n, 2) arrays, best level first."""
+        if self.last_timestamp is not None and timestamp_ms <= self.last_timestamp:
+            raise ValueError(
+                f"Snapshot at {timestamp_ms} is not after the last one ({self.last_timestamp})."
+            )
+        i = self._pending
+        self._timestamps[i] = timestamp_ms
+        self._fill(self._bids[i], bids)
+        self._fill(self._asks[i], asks)
+        self._pending += 1
+        self.last_timestamp = timestamp_ms
+        if self._pending == self.flush_every:
+            self.flush()
+
+    def _fill(self, row, levels):
+        n = min(len(levels), self.depth)
+        row[:n] = levels[:n]
+        row[n:] = np.nan
+
+    def flush(self):
+        """Append staged snapshots to disk."""
+        if not self._pending:
+            return
+        n = self._pending
+        # Timestamps go last: readers size the recording from them
+        for name, data in (
+            (BIDS_FILE, self._bids),
+            (ASKS_FILE, self._asks),
+            (TIMESTAMPS_FILE, self._timestamps),
+        ):
+            with open(os.path.join(self.path, name), "ab") as f:
+                f.write(data[:n].tobytes())
+        self._pending = 0
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class BookReader:
+    """Memory-mapped, read-only view over a recording directory."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, META_FILE)) as f:
+            self.depth = json.load(f)["depth"]
+        self.timestamps = self._map(TIMESTAMPS_FILE, np.int64, ())
+        count = len(self.timestamps)
+        self.bids = self._map(BIDS_FILE, np.float64, (self.depth, 2))[:count]
+        self.asks = self._map(ASKS_FILE, np.float64, (self.depth, 2))[:count]
+
+    def _map(self, name, dtype, shape):
+        file_path = os.path.join(self.path, name)
+        row_size = np.dtype(dtype).itemsize * int(np.prod(shape))
+        rows = os.path.getsize(file_path) // row_size if os.path.exists(file_path) else 0
+        if not rows:
+            return np.empty((0, *shape), dtype=dtype)
+        return np.memmap(file_path, dtype=dtype, mode="r", shape=(rows, *shape))
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def range(self, start_ms=None, end_ms=None):
+        """Snapshots with ``start_ms <= timestamp < end_ms`` as memmap slices."""
+        lo = 0 if start_ms is None else np.searchsorted(self.timestamps, start_ms, "left")
+        hi = (
+            len(self)
+            if end_ms is None
+            else np.searchsorted(self.timestamps, end_ms, "left")
+        )
+        return self.timestamps[lo:hi], self.bids[lo:hi], self.asks[lo:hi]
+
+
+def run(symbol, path, interval=1.0, depth=100):
+    """Record REST depth snapshots of ``symbol`` every ``interval`` seconds."""
+    with BookRecorder(path, depth=depth) as recorder:
+        while True:
+            started = time.time()
+            try:
+                bids, asks = parse_order_book(fetch_snapshot(symbol, limit=depth))
+                recorder.record(int(started * 1000), bids, asks)
+            except Exception as e:
+                logging.error(f"Failed to record {symbol} snapshot: {e}")
+            time.sleep(max(0.0, interval - (time.time() - started)))
+
+
+if __name__ == "__main__":
+    symbol = sys.argv[1] if len(sys.argv) > 1 else "BTCUSDT"
+    run(symbol, os.path.join("recordings", symbol))
@@ -0,0 +1,166 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from orderBook import analyze_order_book, parse_order_book
+
+DEPTH_URL = "https://api.binance.com/api/v3/depth"
+SCAN_BAND = 0.005  # rank symbols by imbalance within 0.5% of mid
+
+
+def depth_weight(limit):
+    """Binance request weight of a ``/api/v3/depth`` call."""
+    if limit <= 100:
+        return 5
+    if limit <= 500:
+        return 25
+    if limit <= 1000:
+        return 50
+    return 250
+
+
+class RateBudget:
+    """Thread-safe token bucket over Binance's per-minute request weight.
+
+    The bucket holds at most ``burst`` weight (a tenth of the limit by
+    default) and refills at the rest of the limit per minute, so no
+    60-second window spends more than ``weight_per_minute``. ``observe``
+    folds in the weight Binance reports as used, which also counts other
+    clients sharing the IP.
+    """
+
+    def __init__(self, weight_per_minute=6000, burst=None):
+        self.limit = weight_per_minute
+        self.capacity = burst if burst is not None else weight_per_minute // 10
+        self.rate = (weight_per_minute - self.capacity) / 60.0
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, weight):
+        """Block until ``weight`` can be spent."""
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= weight:
+                    self.tokens -= weight
+                    return
+                wait = (weight - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def observe(self, used_weight):
+        """Never spend more than what Binance says is left this minute."""
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.tokens, float(self.limit - used_weight))
+
+
+_budgets = {}
+_budgets_lock = threading.Lock()
+
+
+def shared_budget(weight_per_minute=6000):
+    """The process-wide budget for a weight limit, reused by every scan."""
+    with _budgets_lock:
+        if weight_per_minute not in _budgets:
+            _budgets[weight_per_minute] = RateBudget(weight_per_minute)
+        return _budgets[weight_per_minute]
+
+
+def make_session(pool_size=16, retries=3):
+    """Session with a connection pool sized for the scanner's workers."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=pool_size,
+        max_retries=Retry(
+            total=retries,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET",),
+        ),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def scan_symbol(session, symbol, limit, url, budget):
+    """Fetch and analyse one symbol's depth."""
+    budget.acquire(depth_weight(limit))
+    started = time.perf_counter()
+    response = session.get(url, params={"symbol": symbol, "limit": limit}, timeout=10)
+    used_weight = response.headers.get("X-MBX-USED-WEIGHT-1M")
+    if used_weight:
+        budget.observe(int(used_weight))
+    response.raise_for_status()
+    bids, asks = parse_order_book(response.json())
+    if not len(bids) or not len(asks):
+        raise ValueError("Empty order book.")
+    stats = analyze_order_book(bids, asks, bands=(SCAN_BAND,), sizes=())
+    band = stats["bands"][SCAN_BAND]
+    return {
+        "symbol": symbol,
+        "mid": stats["mid"],
+        "spread_bps": stats["spread_bps"],
+        "microprice": stats["microprice"],
+        "band_imbalance": band["imbalance"],
+        "band_bid_volume": band["bid_volume"],
+        "band_ask_volume": band["ask_volume"],
+        "imbalance": stats["imbalance"],
+        "latency_ms": (time.perf_counter() - started) * 1000,
+    }
+
+
+def scan(
+    symbols,
+    limit=100,
+    max_workers=16,
+    url=DEPTH_URL,
+    weight_per_minute=6000,
+    session=None,
+    budget=None,
+):
+    """Fetch depth for many symbols concurrently and rank them by imbalance.
+
+    Requests share one pooled session and a rate budget so the scan stays
+    within Binance's request weight limit; the budget outlives the call
+    (``shared_budget`` unless one is passed), so back-to-back scans share
+    it too. Symbols that fail are logged and left out of the result.
+    """
+    session = session or make_session(max_workers)
+    budget = budget or shared_budget(weight_per_minute)
+
+    def fetch(symbol):
+        try:
+            return scan_symbol(session, symbol, limit, url, budget)
+        except Exception as e:
+            logging.error(f"Failed to scan {symbol}: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        rows = [row for row in pool.map(fetch, symbols) if row]
+    return sorted(rows, key=lambda row: row["band_imbalance"], reverse=True)
+
+
+def format_table(rows):
+    """Render scan results as a ranked text table."""
+    if not rows:
+        return "No symbols scanned."
+    df = pd.DataFrame(rows).set_index("symbol")
+    df.index.name = None
+    return df.to_string(
+        columns=["mid", "spread_bps", "band_imbalance", "imbalance", "latency_ms"],
+        float_format=lambda x: f"{x:.4f}",
+    )
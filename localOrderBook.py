@@ -0,0 +1,218 @@
+import json
+import logging
+import time
+from collections import deque
+from itertools import islice
+
+import numpy as np
+import requests
+from sortedcontainers import SortedDict
+
+DEPTH_URL = "https://api.binance.com/api/v3/depth"
+STREAM_URL = "wss://stream.binance.com:9443/ws/{symbol}@depth@100ms"
+
+
+class OrderBookGap(Exception):
+    """Raised when the book cannot be brought back in sequence."""
+
+
+def fetch_snapshot(symbol, limit=1000, session=None):
+    """Download a REST depth snapshot to seed a local book."""
+    response = (session or requests).get(
+        DEPTH_URL, params={"symbol": symbol, "limit": limit}, timeout=10
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+class LocalOrderBook:
+    """Order book kept current from Binance diff-depth events.
+
+    The book is seeded once from a REST snapshot and then updated from
+    ``depthUpdate`` events following Binance's ``U``/``u`` update-id rules:
+    events older than the snapshot are dropped, the first applied event must
+    straddle ``lastUpdateId + 1`` and every later one must start at the
+    previous ``u + 1``. On a gap the book is cleared and re-seeded through
+    ``snapshot_loader`` (or waits for the next ``seed()`` when there is none,
+    e.g. while replaying a recording). Levels live in sorted dicts, so best
+    bid/ask lookups and updates are O(log n).
+    """
+
+    def __init__(self, symbol, snapshot_loader=None, buffer_size=10000, max_resyncs=5):
+        self.symbol = symbol
+        self.snapshot_loader = snapshot_loader
+        self.max_resyncs = max_resyncs
+        self.bids = SortedDict()  # keyed by -price so the best bid comes first
+        self.asks = SortedDict()
+        self.last_update_id = None
+        self.resyncs = 0
+        self.updates = 0
+        self._synced = False
+        self._failed_resyncs = 0
+        self._buffer = deque(maxlen=buffer_size)
+
+    def seed(self, snapshot=None):
+        """Load a depth snapshot and apply any events buffered meanwhile."""
+        if snapshot is None:
+            snapshot = self.snapshot_loader(self.symbol)
+        self.bids.clear()
+        self.asks.clear()
+        for price, qty in snapshot["bids"]:
+            self.bids[-float(price)] = float(qty)
+        for price, qty in snapshot["asks"]:
+            self.asks[float(price)] = float(qty)
+        self.last_update_id = snapshot["lastUpdateId"]
+        self._synced = False
+        self._drain()
+
+    def on_event(self, event):
+        """Handle one ``depthUpdate`` event."""
+        self._buffer.append(event)
+        if self.last_update_id is not None:
+            self._drain()
+
+    def _drain(self):
+        while self._buffer and self.last_update_id is not None:
+            event = self._buffer.popleft()
+            if event["u"] <= self.last_update_id:
+                continue
+            expected = self.last_update_id + 1
+            if event["U"] > expected or (self._synced and event["U"] != expected):
+                self._buffer.appendleft(event)
+                self._resync(expected, event["U"])
+                return
+            self._apply(event)
+
+    def _apply(self, event):
+        for price, qty in event["b"]:
+            self._set_level(self.bids, -float(price), float(qty))
+        for price, qty in event["a"]:
+            self._set_level(self.asks, float(price), float(qty))
+        self.last_update_id = event["u"]
+        self._synced = True
+        self._failed_resyncs = 0
+        self.updates += 1
+
+    @staticmethod
+    def _set_level(side, key, qty):
+        if qty:
+            side[key] = qty
+        else:
+            side.pop(key, None)
+
+    def _resync(self, expected, got):
+        logging.warning(
+            f"{self.symbol} depth gap: expected update {expected}, got {got}. Resyncing."
+        )
+        self.resyncs += 1
+        self.last_update_id = None
+        self._synced = False
+        if self.snapshot_loader is None:
+            return
+        self._failed_resyncs += 1
+        if self._failed_resyncs > self.max_resyncs:
+            raise OrderBookGap(
+                f"{self.symbol}: gave up after {self.max_resyncs} resync attempts"
+            )
+        self.seed()
+
+    @property
+    def synced(self):
+        return self._synced
+
+    def best_bid(self):
+        """Best bid as ``(price, qty)``, or None."""
+        if not self.bids:
+            return None
+        key, qty = self.bids.peekitem(0)
+        return -key, qty
+
+    def best_ask(self):
+        """Best ask as ``(price, qty)``, or None."""
+        if not self.asks:
+            return None
+        return self.asks.peekitem(0)
+
+    def top(self, n=10):
+        """Top ``n`` levels per side as (n, 2) arrays, best first."""
+        bids = np.array(
+            [(-key, qty) for key, qty in islice(self.bids.items(), n)], dtype=np.float64
+        ).reshape(-1, 2)
+        asks = np.array(list(islice(self.asks.items(), n)), dtype=np.float64).reshape(
+            -1, 2
+        )
+        return bids, asks
+
+
+def replay(path, book):
+    """Feed a recorded NDJSON file of snapshots and depth events into a book.
+
+    Lines carrying ``lastUpdateId`` are snapshots and seed the book; all
+    other lines are ``depthUpdate`` events.
+    """
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            message = json.loads(line)
+            if "lastUpdateId" in message:
+                book.seed(message)
+            else:
+                book.on_event(message)
+    return book
+
+
+async def stream(book):
+    """Maintain ``book`` from Binance's live diff-depth websocket stream."""
+    import websockets
+
+    if book.snapshot_loader is None:
+        book.snapshot_loader = fetch_snapshot
+    async with websockets.connect(STREAM_URL.format(symbol=book.symbol.lower())) as ws:
+        seeded = False
+        async for message in ws:
+            book.on_event(json.loads(message))
+            if not seeded:
+                book.seed()
+                seeded = True
+
+
+def benchmark(levels=5000, events=100000, changes=10, seed=0):
+    """Apply synthetic depth events to a seeded book and return updates/sec."""
+    rng = np.random.default_rng(seed)
+    mid = 50000.0
+    ticks = np.arange(1, levels + 1) * 0.01
+    snapshot = {
+        "lastUpdateId": 0,
+        "bids": [[f"{mid - t:.2f}", "1.0"] for t in ticks],
+        "asks": [[f"{mid + t:.2f}", "1.0"] for t in ticks],
+    }
+    offsets = rng.integers(1, levels, size=(events, 2, changes)) * 0.01
+    qtys = rng.choice([0.0, 0.5, 1.0, 2.0], size=(events, 2, changes))
+    stream_events = [
+        {
+            "U": i + 1,
+            "u": i + 1,
+            "b": [[f"{mid - o:.2f}", f"{q}"] for o, q in zip(offsets[i, 0], qtys[i, 0])],
+            "a": [[f"{mid + o:.2f}", f"{q}"] for o, q in zip(offsets[i, 1], qtys[i, 1])],
+        }
+        for i in range(events)
+    ]
+
+    book = LocalOrderBook("BENCH")
+    book.seed(snapshot)
+    started = time.perf_counter()
+    for event in stream_events:
+        book.on_event(event)
+        book.best_bid()
+        book.best_ask()
+    elapsed = time.perf_counter() - started
+    return {"events": events, "seconds": elapsed, "updates_per_sec": events / elapsed}
+
+
+if __name__ == "__main__":
+    result = benchmark()
+    print(
+        f"Applied {result['events']} depth events in {result['seconds']:.2f}s "
+        f"({result['updates_per_sec']:,.0f} updates/sec)"
+    )
@@ -4,95 +4,73 @@ import os
 from dotenv import load_dotenv
 from metaapi_cloud_sdk import CopyFactory, MetaApi
 
+from configSync import load_config, print_report, sync_config
+
 load_dotenv()
 
 token = os.getenv("TOKEN")
 provider_account_id = os.getenv("PROVIDER_ACCOUNT_ID")
 subscriber_account_ids = os.getenv("SUBSCRIBER_ACCOUNT_IDS", "").split(",")
+# YAML/JSON file describing strategies and subscribers; defaults to the env settings above
+config_path = os.getenv("COPYFACTORY_CONFIG")
+# Changes applied at once, and whether to only print the planned changes
+max_concurrency = int(os.getenv("MAX_CONCURRENCY", "10"))
+dry_run = os.getenv("DRY_RUN", "false").lower() == "true"
 
 
-async def configure_copyfactory():
-    api = MetaApi(token)
-    copyfactory = CopyFactory(token)
-
-    try:
-        provider_metaapi_account = await api.metatrader_account_api.get_account(
-            provider_account_id
-        )
-        if (
-            provider_metaapi_account is None
-            or provider_metaapi_account.copy_factory_roles is None
-            or "PROVIDER" not in provider_metaapi_account.copy_factory_roles
-        ):
-            raise Exception(
-                "Please specify PROVIDER copyFactoryRoles value in your MetaApi "
-                "account in order to use it in CopyFactory API"
-            )
-
-        configuration_api = copyfactory.configuration_api
-        strategies = (
-            await configuration_api.get_strategies_with_infinite_scroll_pagination()
-        )
-        strategy = next(
-            (s for s in strategies if s["accountId"] == provider_metaapi_account.id),
-            None,
-        )
-
-        if strategy:
-            strategy_id = strategy["_id"]
-        else:
-            strategy_id = (await configuration_api.generate_strategy_id())["id"]
-
-        # Create a strategy being copied
-        await configuration_api.update_strategy(
-            strategy_id,
+def env_config():
+    """Single strategy for PROVIDER_ACCOUNT_ID copied by SUBSCRIBER_ACCOUNT_IDS."""
+    return {
+        "strategies": [
             {
                 "name": "Test strategy",
                 "description": "Some useful description about your strategy",
-                "accountId": provider_metaapi_account.id,
+                "accountId": provider_account_id,
                 "copyStopLoss": True,
                 "copyTakeProfit": True,
                 "tradeSizeScaling": {"mode": "none"},
-            },
-        )
+            }
+        ],
+        "subscribers": [
+            {
+                "accountId": subscriber_id,
+                "subscriptions": [
+                    {
+                        "strategy": "Test strategy",
+                        "multiplier": 1.56,
+                        "copyStopLoss": True,
+                        "copyTakeProfit": True,
+                    }
+                ],
+            }
+            for subscriber_id in dict.fromkeys(
+                s.strip() for s in subscriber_account_ids if s.strip()
+            )
+        ],
+    }
 
-        # Create subscribers
-        for subscriber_id in subscriber_account_ids:
-            subscriber_id = subscriber_id.strip()
-            if not subscriber_id:
-                continue  # Skip empty values
 
-            subscriber_metaapi_account = await api.metatrader_account_api.get_account(
-                subscriber_id
-            )
-            if (
-                subscriber_metaapi_account is None
-                or subscriber_metaapi_account.copy_factory_roles is None
-                or "SUBSCRIBER" not in subscriber_metaapi_account.copy_factory_roles
-            ):
-                print(f"Skipping {subscriber_id}: Not a valid subscriber.")
-                continue
+async def configure_copyfactory(api=None, copyfactory=None, config=None):
+    api = api or MetaApi(token)
+    copyfactory = copyfactory or CopyFactory(token)
+    if config is None:
+        config = load_config(config_path) if config_path else env_config()
 
-            await configuration_api.update_subscriber(
-                subscriber_metaapi_account.id,
-                {
-                    "name": f"Subscriber {subscriber_metaapi_account.id}",
-                    "subscriptions": [
-                        {
-                            "strategyId": strategy_id,
-                            "multiplier": 1.56,
-                            "copyStopLoss": True,
-                            "copyTakeProfit": True,
-                        }
-                    ],
-                },
-            )
-            print(
-                f"Successfully subscribed {subscriber_metaapi_account.id} to strategy {strategy_id}"
-            )
+    try:
+        # Only strategies and subscribers that differ from CopyFactory are updated
+        results = await sync_config(
+            api,
+            copyfactory.configuration_api,
+            config,
+            max_concurrency=max_concurrency,
+            dry_run=dry_run,
+        )
+        print_report(results)
+        return results
 
     except Exception as err:
         print(api.format_error(err))
 
 
-asyncio.run(configure_copyfactory())
+if __name__ == "__main__":
+    asyncio.run(configure_copyfactory())
@@ -0,0 +1,278 @@
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timezone
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+MAX_RETRIES = 5
+BASE_RETRY_DELAY = 1.0
+MAX_RETRY_DELAY = 60.0
+
+
+def is_rate_limited(err):
+    """True for the SDK's TooManyRequestsException or any HTTP 429 error."""
+    return (
+        type(err).__name__ == "TooManyRequestsException"
+        or getattr(err, "status", None) == 429
+        or getattr(err, "status_code", None) == 429
+    )
+
+
+def retry_delay(err, attempt):
+    """Wait suggested by the server, else exponential backoff with jitter."""
+    metadata = getattr(err, "metadata", None) or {}
+    retry_time = metadata.get("recommendedRetryTime") if isinstance(metadata, dict) else None
+    if retry_time:
+        try:
+            retry_at = datetime.fromisoformat(str(retry_time).replace("Z", "+00:00"))
+            return min(
+                max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0),
+                MAX_RETRY_DELAY,
+            )
+        except ValueError:
+            pass
+    return min(BASE_RETRY_DELAY * 2**attempt, MAX_RETRY_DELAY) * random.uniform(0.5, 1.0)
+
+
+async def with_retry(call, *args):
+    """Await ``call(*args)``, retrying rate-limit errors up to MAX_RETRIES times."""
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            return await call(*args)
+        except Exception as err:
+            if not is_rate_limited(err) or attempt == MAX_RETRIES:
+                raise
+            await asyncio.sleep(retry_delay(err, attempt))
+
+
+def config_matches(existing, desired):
+    """True if every field of ``desired`` has the same value in ``existing``."""
+    if isinstance(desired, dict):
+        return isinstance(existing, dict) and all(
+            config_matches(existing.get(key), value) for key, value in desired.items()
+        )
+    if isinstance(desired, list):
+        return (
+            isinstance(existing, list)
+            and len(existing) == len(desired)
+            and all(config_matches(e, d) for e, d in zip(existing, desired))
+        )
+    return existing == desired
+
+
+def load_config(path):
+    """Read a strategies/subscribers config from a YAML or JSON file.
+
+    Strategies are CopyFactory strategy bodies plus an optional ``id``.
+    Each subscriber has an ``accountId``, an optional ``name`` and
+    ``subscriptions`` naming their strategy by ``strategy`` (its name) or
+    ``strategyId``; the other subscription fields are sent as given.
+    """
+    with open(path) as f:
+        if path.endswith((".yaml", ".yml")):
+            if yaml is None:
+                raise ImportError("PyYAML is required for YAML configs")
+            config = yaml.safe_load(f)
+        else:
+            config = json.load(f)
+    return {
+        "strategies": config.get("strategies") or [],
+        "subscribers": config.get("subscribers") or [],
+    }
+
+
+def _sorted_subscriptions(subscriptions):
+    return sorted(subscriptions or [], key=lambda s: s.get("strategyId") or "")
+
+
+def _change(kind, id, action, body, account_id):
+    return {"kind": kind, "id": id, "action": action, "body": body, "accountId": account_id}
+
+
+async def plan_sync(configuration_api, config):
+    """Diff a config against CopyFactory; returns one change per configured entry.
+
+    Remote strategies and subscribers are listed once and indexed, so
+    planning costs two list calls (plus an id for each new strategy)
+    whatever the size of the config. Entries only present remotely are
+    left alone.
+    """
+    strategies, subscribers = await asyncio.gather(
+        with_retry(configuration_api.get_strategies_with_infinite_scroll_pagination),
+        with_retry(configuration_api.get_subscribers_with_infinite_scroll_pagination),
+    )
+    strategies_by_id = {s["_id"]: s for s in strategies}
+    strategies_by_name = {(s.get("accountId"), s.get("name")): s for s in strategies}
+    strategies_by_account = {}
+    for s in strategies:
+        strategies_by_account.setdefault(s.get("accountId"), []).append(s)
+    subscribers_by_id = {s["_id"]: s for s in subscribers}
+
+    # Match in passes, each skipping strategies claimed by an earlier one: ids,
+    # then (accountId, name), then for renamed strategies the account's first
+    # unclaimed strategy, as app.py did. Exact matches never lose a strategy to
+    # another entry's fallback.
+    entries = config["strategies"]
+    bodies = [{k: v for k, v in strategy.items() if k != "id"} for strategy in entries]
+    remotes = [None] * len(entries)
+    claimed = set()
+
+    def claim(i, candidates):
+        remote = next((s for s in candidates if s is not None and s["_id"] not in claimed), None)
+        if remote is not None:
+            remotes[i] = remote
+            claimed.add(remote["_id"])
+
+    for i, strategy in enumerate(entries):
+        claim(i, [strategies_by_id.get(strategy.get("id"))])
+    for i, body in enumerate(bodies):
+        if remotes[i] is None:
+            claim(i, [strategies_by_name.get((body.get("accountId"), body.get("name")))])
+    for i, strategy in enumerate(entries):
+        if remotes[i] is None and not strategy.get("id"):
+            claim(i, strategies_by_account.get(bodies[i].get("accountId"), []))
+
+    changes = []
+    strategy_ids = {}
+    for strategy, body, remote in zip(entries, bodies, remotes):
+        if remote is not None:
+            strategy_id = remote["_id"]
+            action = "unchanged" if config_matches(remote, body) else "update"
+        else:
+            strategy_id = strategy.get("id") or (
+                await with_retry(configuration_api.generate_strategy_id)
+            )["id"]
+            action = "create"
+        strategy_ids[body.get("name")] = strategy_id
+        changes.append(_change("strategy", strategy_id, action, body, body.get("accountId")))
+
+    for subscriber in config["subscribers"]:
+        account_id = subscriber["accountId"]
+        subscriptions = []
+        for subscription in subscriber.get("subscriptions") or []:
+            subscription = dict(subscription)
+            name = subscription.pop("strategy", None)
+            if name is not None:
+                if name not in strategy_ids:
+                    raise ValueError(f"Subscriber {account_id} references unknown strategy {name}")
+                subscription["strategyId"] = strategy_ids[name]
+            subscriptions.append(subscription)
+        body = {
+            "name": subscriber.get("name") or f"Subscriber {account_id}",
+            "subscriptions": _sorted_subscriptions(subscriptions),
+        }
+        remote = subscribers_by_id.get(account_id)
+        if remote is None:
+            action = "create"
+        else:
+            remote = dict(remote, subscriptions=_sorted_subscriptions(remote.get("subscriptions")))
+            action = "unchanged" if config_matches(remote, body) else "update"
+        changes.append(_change("subscriber", account_id, action, body, account_id))
+    return changes
+
+
+def _result(change, status, detail="", seconds=0.0):
+    return {
+        "kind": change["kind"],
+        "id": change["id"],
+        "action": change["action"],
+        "status": status,
+        "detail": detail,
+        "seconds": seconds,
+    }
+
+
+async def _apply_change(api, configuration_api, change, semaphore, validate_roles):
+    started = time.perf_counter()
+    result = _result(change, "applied")
+    role = "PROVIDER" if change["kind"] == "strategy" else "SUBSCRIBER"
+    update = (
+        configuration_api.update_strategy
+        if change["kind"] == "strategy"
+        else configuration_api.update_subscriber
+    )
+    async with semaphore:
+        try:
+            if validate_roles:
+                account = await with_retry(
+                    api.metatrader_account_api.get_account, change["accountId"]
+                )
+                if account is None or role not in (account.copy_factory_roles or []):
+                    result.update(status="skipped", detail=f"Account is not a {role}")
+                    return result
+            await with_retry(update, change["id"], change["body"])
+        except Exception as err:
+            result.update(status="failed", detail=str(api.format_error(err)))
+        finally:
+            result["seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+async def apply_sync(api, configuration_api, changes, max_concurrency=10, validate_roles=True):
+    """Apply created and updated entries in parallel; returns a report per change.
+
+    Strategies go first so new subscriptions never point at a missing
+    strategy; subscribers using a strategy that failed or was skipped are
+    skipped too. Unchanged entries make no API calls.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    results = []
+    for kind in ("strategy", "subscriber"):
+        pending = [c for c in changes if c["kind"] == kind and c["action"] != "unchanged"]
+        if kind == "subscriber":
+            blocked = {
+                r["id"] for r in results if r["status"] in ("failed", "skipped")
+            }
+            for change in list(pending):
+                missing = sorted(
+                    {s.get("strategyId") for s in change["body"]["subscriptions"]} & blocked
+                )
+                if missing:
+                    pending.remove(change)
+                    results.append(
+                        _result(
+                            change, "skipped", f"Strategy {', '.join(missing)} was not applied"
+                        )
+                    )
+        results.extend(
+            await asyncio.gather(
+                *(
+                    _apply_change(api, configuration_api, c, semaphore, validate_roles)
+                    for c in pending
+                )
+            )
+        )
+        results.extend(
+            _result(c, "unchanged")
+            for c in changes
+            if c["kind"] == kind and c["action"] == "unchanged"
+        )
+    return results
+
+
+async def sync_config(
+    api, configuration_api, config, max_concurrency=10, validate_roles=True, dry_run=False
+):
+    """Bring CopyFactory in line with a config; returns the per-entry report."""
+    changes = await plan_sync(configuration_api, config)
+    if dry_run:
+        return [_result(c, "planned") for c in changes]
+    return await apply_sync(api, configuration_api, changes, max_concurrency, validate_roles)
+
+
+def print_report(results):
+    for result in results:
+        print(
+            f"{result['kind']} {result['id']}: {result['action']} {result['status']} "
+            f"({result['seconds']}s) {result['detail']}"
+        )
+    counts = {}
+    for result in results:
+        key = f"{result['kind']} {result['status']}"
+        counts[key] = counts.get(key, 0) + 1
+    print(", ".join(f"{count} {key}" for key, count in sorted(counts.items())))
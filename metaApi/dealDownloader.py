@@ -0,0 +1,198 @@
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+BASE_URL = "https://mt-client-api-v1.london.agiliumtrade.ai"
+URL_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S.000Z"
+PAGE_SIZE = 1000
+
+Window = Tuple[str, str]
+
+
+def make_session(token: str, pool_size: int = 8, retries: int = 5) -> requests.Session:
+    """Pooled session that retries throttled and failed requests with backoff."""
+    session = requests.Session()
+    session.headers.update({"Accept": "application/json", "auth-token": token})
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=pool_size,
+        max_retries=Retry(
+            total=retries,
+            backoff_factor=1.0,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET",),
+            respect_retry_after_header=True,
+        ),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def split_windows(start: datetime, end: datetime, window: timedelta) -> List[Window]:
+    """Consecutive ``[start, end)`` windows covering the range."""
+    windows = []
+    while start < end:
+        stop = min(start + window, end)
+        windows.append((start.strftime(URL_TIME_FORMAT), stop.strftime(URL_TIME_FORMAT)))
+        start = stop
+    return windows
+
+
+def fetch_window(
+    session: requests.Session,
+    account_id: str,
+    window: Window,
+    base_url: str = BASE_URL,
+    page_size: int = PAGE_SIZE,
+) -> List[Dict[str, Any]]:
+    """Every deal in one time window, following offset/limit pagination."""
+    url = f"{base_url}/users/current/accounts/{account_id}/history-deals/time/{window[0]}/{window[1]}"
+    deals: List[Dict[str, Any]] = []
+    while True:
+        response = session.get(
+            url, params={"offset": len(deals), "limit": page_size}, timeout=60
+        )
+        response.raise_for_status()
+        page = response.json()
+        deals.extend(page)
+        if len(page) < page_size:
+            return deals
+
+
+class Checkpoint:
+    """Download progress saved next to the output file.
+
+    Records which windows are complete and how many bytes of the output
+    they account for, so a resumed download truncates any partially
+    written window and fetches only what is missing.
+    """
+
+    def __init__(self, path: str, params: Dict[str, Any]):
+        self.path = path
+        self.params = params
+        self.end: Optional[str] = None
+        self.done: List[Window] = []
+        self.offset = 0
+        if os.path.exists(path):
+            with open(path) as f:
+                state = json.load(f)
+            if state.get("params") == params:
+                self.end = state["end"]
+                self.done = [tuple(w) for w in state["done"]]
+                self.offset = state["offset"]
+            else:
+                logging.warning(f"Ignoring checkpoint {path} from a different download")
+
+    def reset(self, end: str):
+        self.end, self.done, self.offset = end, [], 0
+
+    def save(self):
+        tmp = f"{self.path}.tmp"
+        state = {"params": self.params, "end": self.end, "done": self.done, "offset": self.offset}
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp, self.path)
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def download_deals(
+    account_id: str,
+    token: str,
+    start: datetime,
+    end: Optional[datetime] = None,
+    path: str = "deals.ndjson",
+    window: timedelta = timedelta(days=7),
+    max_workers: int = 4,
+    base_url: str = BASE_URL,
+    session: Optional[requests.Session] = None,
+) -> Dict[str, Any]:
+    """Download an account's deals to an NDJSON file, resuming if interrupted.
+
+    The range is split into ``window``-sized pieces fetched concurrently
+    over one pooled session. Each finished window is appended to ``path``
+    and checkpointed, so only a few windows are ever held in memory and a
+    rerun with the same arguments picks up where the last one stopped;
+    without an explicit ``end`` it finishes the interrupted range. Deals
+    are written in window completion order, not time order.
+    """
+    checkpoint = Checkpoint(
+        f"{path}.checkpoint",
+        {
+            "account_id": account_id,
+            "start": start.strftime(URL_TIME_FORMAT),
+            "window": window.total_seconds(),
+        },
+    )
+    if end is None and checkpoint.end:
+        end = datetime.strptime(checkpoint.end, URL_TIME_FORMAT).replace(tzinfo=timezone.utc)
+    end = end or datetime.now(timezone.utc)
+    if checkpoint.end != end.strftime(URL_TIME_FORMAT):
+        checkpoint.reset(end.strftime(URL_TIME_FORMAT))
+    if checkpoint.done and (
+        not os.path.exists(path) or os.path.getsize(path) < checkpoint.offset
+    ):
+        # The deals of the done windows are gone: fetch everything again
+        logging.warning(f"{path} is missing or shorter than its checkpoint; starting over")
+        checkpoint.reset(checkpoint.end)
+    windows = split_windows(start, end, window)
+    done = set(checkpoint.done)
+    pending = [w for w in windows if w not in done]
+    session = session or make_session(token, pool_size=max_workers)
+
+    mode = "r+b" if checkpoint.done else "wb"
+    written = 0
+    failed: List[Window] = []
+    with open(path, mode) as out, ThreadPoolExecutor(max_workers=max_workers) as pool:
+        out.truncate(checkpoint.offset if mode == "r+b" else 0)
+        out.seek(0, os.SEEK_END)
+        futures = {
+            pool.submit(fetch_window, session, account_id, w, base_url): w for w in pending
+        }
+        for future in as_completed(futures):
+            w = futures[future]
+            try:
+                deals = future.result()
+            except Exception as e:
+                # Keep saving the other windows; a rerun fetches the failed ones
+                logging.error(f"Failed to download deals for {w[0]} - {w[1]}: {e}")
+                failed.append(w)
+                continue
+            out.write(b"".join(json.dumps(d).encode() + b"\n" for d in deals))
+            out.flush()
+            os.fsync(out.fileno())
+            checkpoint.done.append(w)
+            checkpoint.offset = out.tell()
+            checkpoint.save()
+            written += len(deals)
+            logging.info(f"Downloaded {len(deals)} deals for {w[0]} - {w[1]}")
+
+    if failed:
+        raise RuntimeError(
+            f"{len(failed)} of {len(windows)} windows failed; rerun to resume from {checkpoint.path}"
+        )
+    checkpoint.remove()
+    return {
+        "path": path,
+        "windows": len(windows),
+        "resumed_windows": len(windows) - len(pending),
+        "deals": written,
+    }
+
+
+def read_deals(path: str) -> Iterator[Dict[str, Any]]:
+    """Deals from a downloaded NDJSON file, one at a time."""
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
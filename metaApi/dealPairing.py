@@ -0,0 +1,145 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+TRADE_DEAL_TYPES = {"DEAL_TYPE_BUY": "buy", "DEAL_TYPE_SELL": "sell"}
+ENTRY_TYPES = {"DEAL_ENTRY_IN"}
+# Close-by (OUT_BY) deals reduce the position like a plain exit
+EXIT_TYPES = {"DEAL_ENTRY_OUT", "DEAL_ENTRY_OUT_BY"}
+REVERSAL_TYPES = {"DEAL_ENTRY_INOUT"}
+VOLUME_EPSILON = 1e-9
+
+
+def parse_deal_time(value: Optional[str]) -> Optional[datetime]:
+    """Parse a MetaApi deal time such as ``2025-01-02T10:00:00.000Z``."""
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _new_position(position_id: str, deal: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "position_id": position_id,
+        "symbol": deal.get("symbol"),
+        "direction": None,
+        "magic": deal.get("magic"),
+        "open_time": None,
+        "open_broker_time": None,
+        "close_time": None,
+        "close_broker_time": None,
+        "volume": 0.0,
+        "closed_volume": 0.0,
+        "entry_value": 0.0,
+        "exit_value": 0.0,
+        "commission": 0.0,
+        "swap": 0.0,
+        "profit": 0.0,
+        "entries": 0,
+        "exits": 0,
+        "deal_ids": [],
+    }
+
+
+def _finish(position: Dict[str, Any]) -> Dict[str, Any]:
+    volume, closed = position["volume"], position["closed_volume"]
+    entry_value, exit_value = position.pop("entry_value"), position.pop("exit_value")
+    opened = parse_deal_time(position["open_time"])
+    closed_at = parse_deal_time(position["close_time"])
+    position.update(
+        {
+            "entry_price": entry_value / volume if volume else None,
+            "exit_price": exit_value / closed if closed else None,
+            "net_profit": position["profit"] + position["commission"] + position["swap"],
+            "is_closed": volume > 0 and closed >= volume - VOLUME_EPSILON,
+            "holding_seconds": (
+                (closed_at - opened).total_seconds() if opened and closed_at else None
+            ),
+        }
+    )
+    return position
+
+
+def _add_entry(
+    position: Dict[str, Any], deal: Dict[str, Any], direction: str, volume: float
+) -> None:
+    if position["open_time"] is None:
+        position["direction"] = direction
+        position["open_time"] = deal.get("time")
+        position["open_broker_time"] = deal.get("brokerTime")
+    position["volume"] += volume
+    position["entry_value"] += volume * (deal.get("price") or 0.0)
+    position["entries"] += 1
+
+
+def _add_exit(
+    position: Dict[str, Any], deal: Dict[str, Any], direction: str, volume: float
+) -> None:
+    if position["direction"] is None:
+        # Entry outside the loaded window: an exit sells a buy and vice versa
+        position["direction"] = "sell" if direction == "buy" else "buy"
+    position["closed_volume"] += volume
+    position["exit_value"] += volume * (deal.get("price") or 0.0)
+    position["close_time"] = deal.get("time")
+    position["close_broker_time"] = deal.get("brokerTime")
+    position["exits"] += 1
+
+
+def _add_costs(
+    position: Dict[str, Any], deal: Dict[str, Any], share: float = 1.0, realized: bool = True
+) -> None:
+    """Book ``share`` of a deal's commission, plus its swap and profit if ``realized``."""
+    position["commission"] += (deal.get("commission") or 0.0) * share
+    if realized:
+        position["swap"] += deal.get("swap") or 0.0
+        position["profit"] += deal.get("profit") or 0.0
+    position["deal_ids"].append(deal.get("id"))
+
+
+def pair_deals(deals: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Reconcile deals into one round-trip record per position, in one pass.
+
+    Deals are grouped by ``positionId``. Entry and exit prices are
+    volume-weighted over every entry and exit deal, so scaling in and
+    partial closes are covered; commission, swap and profit are summed over
+    all of the position's deals. A reversal (``DEAL_ENTRY_INOUT``) closes
+    only the open volume and starts a new record for the same position
+    with the remainder, in the opposite direction; its commission is split
+    by volume and its profit booked on the close. Positions still open (or
+    whose entry falls before the loaded window) are returned with
+    ``is_closed`` false. Records are ordered by open time.
+    """
+    positions: Dict[str, Dict[str, Any]] = {}
+    records: List[Dict[str, Any]] = []
+    for deal in sorted(deals, key=lambda d: d.get("time") or ""):
+        direction = TRADE_DEAL_TYPES.get(deal.get("type"))
+        position_id = deal.get("positionId")
+        if direction is None or position_id is None:
+            continue  # balance, credit and other non-trading deals
+
+        position = positions.get(position_id)
+        if position is None:
+            position = positions[position_id] = _new_position(position_id, deal)
+        volume = deal.get("volume") or 0.0
+        entry_type = deal.get("entryType")
+
+        if entry_type in REVERSAL_TYPES:
+            open_volume = position["volume"] - position["closed_volume"]
+            # Without the entry in the window the open volume is unknown: treat as an exit
+            if position["entries"] and volume > open_volume + VOLUME_EPSILON:
+                share = open_volume / volume
+                _add_exit(position, deal, direction, open_volume)
+                _add_costs(position, deal, share)
+                records.append(_finish(position))
+                position = positions[position_id] = _new_position(position_id, deal)
+                _add_entry(position, deal, direction, volume - open_volume)
+                _add_costs(position, deal, 1.0 - share, realized=False)
+                continue
+            entry_type = "DEAL_ENTRY_OUT"
+
+        if entry_type in ENTRY_TYPES:
+            _add_entry(position, deal, direction, volume)
+        elif entry_type in EXIT_TYPES:
+            _add_exit(position, deal, direction, volume)
+        _add_costs(position, deal)
+
+    records.extend(_finish(p) for p in positions.values())
+    return sorted(records, key=lambda p: p["open_time"] or p["close_time"] or "")
@@ -0,0 +1,195 @@
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from dealPairing import parse_deal_time
+
+TimeLike = Union[str, datetime, pd.Timestamp]
+
+COLUMNS = [
+    "account_id",
+    "id",
+    "position_id",
+    "order_id",
+    "symbol",
+    "type",
+    "entry_type",
+    "volume",
+    "price",
+    "commission",
+    "swap",
+    "profit",
+    "magic",
+    "time",
+    "broker_time",
+    "comment",
+]
+TIME_COLUMNS = ("time", "broker_time")
+
+
+def _millis(value: Optional[datetime]) -> Optional[int]:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
+
+
+def _to_millis(value: TimeLike) -> int:
+    """Millisecond timestamp of a filter bound; naive values are taken as UTC."""
+    stamp = pd.Timestamp(value)
+    if stamp.tzinfo is None:
+        stamp = stamp.tz_localize("UTC")
+    return stamp.value // 1_000_000
+
+
+def normalize_deal(account_id: str, deal: Dict[str, Any]) -> Tuple[Any, ...]:
+    """Row for a MetaApi deal, with times as epoch milliseconds.
+
+    ``brokerTime`` is the broker's wall clock and is stored as if it were
+    UTC, so it reads back as the same naive timestamp.
+    """
+    broker_time = deal.get("brokerTime")
+    return (
+        account_id,
+        deal["id"],
+        deal.get("positionId"),
+        deal.get("orderId"),
+        deal.get("symbol"),
+        deal.get("type"),
+        deal.get("entryType"),
+        float(deal.get("volume") or 0.0),
+        float(deal.get("price") or 0.0),
+        float(deal.get("commission") or 0.0),
+        float(deal.get("swap") or 0.0),
+        float(deal.get("profit") or 0.0),
+        deal.get("magic"),
+        _millis(parse_deal_time(deal.get("time"))),
+        _millis(datetime.fromisoformat(broker_time)) if broker_time else None,
+        deal.get("comment"),
+    )
+
+
+class DealStore:
+    """SQLite table of normalized deals with typed, indexed columns.
+
+    Deals are keyed by account and deal id, so re-exporting a download
+    updates rows in place. ``query`` loads filtered deals into a DataFrame
+    with ``time`` as UTC timestamps and ``broker_time`` as naive ones.
+    """
+
+    def __init__(self, path: str = "deals.db"):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS deals (
+                    account_id TEXT NOT NULL,
+                    id TEXT NOT NULL,
+                    position_id TEXT,
+                    order_id TEXT,
+                    symbol TEXT,
+                    type TEXT,
+                    entry_type TEXT,
+                    volume REAL NOT NULL,
+                    price REAL NOT NULL,
+                    commission REAL NOT NULL,
+                    swap REAL NOT NULL,
+                    profit REAL NOT NULL,
+                    magic INTEGER,
+                    time INTEGER,
+                    broker_time INTEGER,
+                    comment TEXT,
+                    PRIMARY KEY (account_id, id)
+                );
+                CREATE INDEX IF NOT EXISTS deals_by_position ON deals (position_id);
+                CREATE INDEX IF NOT EXISTS deals_by_symbol ON deals (symbol, time);
+                CREATE INDEX IF NOT EXISTS deals_by_time ON deals (time);
+                """
+            )
+
+    def insert(
+        self, account_id: str, deals: Iterable[Dict[str, Any]], chunk_size: int = 10000
+    ) -> int:
+        """Upsert deals, reading the iterable a chunk at a time; returns the count."""
+        placeholders = ", ".join("?" * len(COLUMNS))
+        updates = ", ".join(f"{c} = excluded.{c}" for c in COLUMNS[2:])
+        sql = (
+            f"INSERT INTO deals ({', '.join(COLUMNS)}) VALUES ({placeholders}) "
+            f"ON CONFLICT (account_id, id) DO UPDATE SET {updates}"
+        )
+        count = 0
+        deals = iter(deals)
+        while True:
+            rows = [normalize_deal(account_id, d) for d in islice(deals, chunk_size)]
+            if not rows:
+                return count
+            with self.lock, self.conn:
+                self.conn.executemany(sql, rows)
+            count += len(rows)
+
+    def query(
+        self,
+        account_id: Optional[str] = None,
+        symbol: Optional[str] = None,
+        start: Optional[TimeLike] = None,
+        end: Optional[TimeLike] = None,
+        entry_type: Optional[str] = None,
+        position_id: Optional[str] = None,
+        types: Optional[List[str]] = None,
+        time_column: str = "time",
+    ) -> pd.DataFrame:
+        """Deals matching every given filter, ordered by time.
+
+        ``start``/``end`` bound ``time_column`` (``time`` or
+        ``broker_time``) as ``start <= t < end``. For example, all BTCUSD
+        closes in March: ``query(symbol="BTCUSD", entry_type="DEAL_ENTRY_OUT",
+        start="2025-03-01", end="2025-04-01")``.
+        """
+        if time_column not in TIME_COLUMNS:
+            raise ValueError(f"time_column must be one of {TIME_COLUMNS}")
+        where: List[str] = []
+        params: List[Any] = []
+        for column, value in (
+            ("account_id", account_id),
+            ("symbol", symbol),
+            ("entry_type", entry_type),
+            ("position_id", position_id),
+        ):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if types:
+            where.append(f"type IN ({', '.join('?' * len(types))})")
+            params.extend(types)
+        if start is not None:
+            where.append(f"{time_column} >= ?")
+            params.append(_to_millis(start))
+        if end is not None:
+            where.append(f"{time_column} < ?")
+            params.append(_to_millis(end))
+
+        sql = f"SELECT {', '.join(COLUMNS)} FROM deals"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {time_column}, id"
+        with self.lock:
+            df = pd.read_sql_query(sql, self.conn, params=params)
+        df["time"] = pd.to_datetime(df["time"], unit="ms", utc=True)
+        df["broker_time"] = pd.to_datetime(df["broker_time"], unit="ms")
+        df["magic"] = df["magic"].astype("Int64")
+        return df
+
+    def export(self, path: str, **filters: Any) -> int:
+        """Write filtered deals to Parquet or Feather (both need pyarrow); returns rows."""
+        df = self.query(**filters)
+        if path.endswith(".feather"):
+            df.to_feather(path)
+        else:
+            df.to_parquet(path, index=False)
+        return len(df)
@@ -1,15 +1,49 @@
+import asyncio
+import base64
+import binascii
+import gzip
+import hashlib
+import heapq
+import json
 import logging
 import os
+import random
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 
 import uvicorn
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from metaapi_cloud_sdk import MetaStats
 from pydantic_settings import BaseSettings
 
+from historyCache import CacheKey, HistoryCache
+from serviceMetrics import LATENCY_BUCKETS, SIZE_BUCKETS, Registry
+from tradeMetrics import TradeMetrics
+from tradeStore import TradeStore, fetch_trades, now_time, sync_account, trade_time
+
+try:
+    import orjson
+
+    def dumps(value: Any) -> bytes:
+        return orjson.dumps(value)
+
+except ImportError:
+
+    def dumps(value: Any) -> bytes:
+        return json.dumps(value, separators=(",", ":")).encode()
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
 load_dotenv()
 
 logging.basicConfig(
@@ -20,11 +54,164 @@ logging.basicConfig(
 class Settings(BaseSettings):
     token: str = os.getenv("METAAPI_TOKEN", "")
     account_id: str = os.getenv("METAAPI_ACCOUNT_ID", "")
+    # Further accounts served by this process, comma-separated
+    account_ids: str = os.getenv("METAAPI_ACCOUNT_IDS", "")
+    max_concurrent_fetches: int = int(os.getenv("MAX_CONCURRENT_FETCHES", "4"))
+    history_start: str = os.getenv("HISTORY_START", "2025-01-01 00:00:00.000")
+    trade_store_path: str = os.getenv("TRADE_STORE_PATH", "trades.db")
+    # Fresh for soft TTL; served stale while refreshing until hard TTL
+    cache_soft_ttl: int = int(os.getenv("CACHE_SOFT_TTL", "60"))
+    cache_hard_ttl: int = int(os.getenv("CACHE_HARD_TTL", "600"))
+    cache_max_entries: int = int(os.getenv("CACHE_MAX_ENTRIES", "256"))
+    cache_max_bytes: int = int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    # Background refresh of each account's default range; 0 disables it
+    prefetch_interval: int = int(os.getenv("PREFETCH_INTERVAL", "45"))
+    prefetch_jitter: float = float(os.getenv("PREFETCH_JITTER", "0.1"))
+    prefetch_max_backoff: int = int(os.getenv("PREFETCH_MAX_BACKOFF", "600"))
+    prefetch_startup_timeout: int = int(os.getenv("PREFETCH_STARTUP_TIMEOUT", "30"))
 
 
 settings = Settings()
 
-app = FastAPI()
+
+registry = Registry()
+
+REQUEST_LATENCY = registry.histogram(
+    "http_request_duration_seconds",
+    "Time to produce a response, by route and status.",
+    ["method", "route", "status"],
+)
+RESPONSE_SIZE = registry.histogram(
+    "http_response_size_bytes",
+    "Size of response bodies sent, after compression.",
+    ["route", "encoding"],
+    buckets=SIZE_BUCKETS,
+)
+REQUEST_ERRORS = registry.counter(
+    "http_request_errors_total",
+    "Requests answered with a 5xx status or an unhandled exception.",
+    ["route"],
+)
+UPSTREAM_LATENCY = registry.histogram(
+    "upstream_request_duration_seconds",
+    "Latency of MetaStats get_account_trades calls.",
+    ["account", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+UPSTREAM_INFLIGHT = registry.gauge(
+    "upstream_requests_in_flight",
+    "MetaStats get_account_trades calls currently awaiting a response.",
+)
+PREFETCH_RUNS = registry.counter(
+    "prefetch_runs_total",
+    "Background history refreshes, by account and outcome.",
+    ["account", "outcome"],
+)
+PREFETCH_LAST_SUCCESS = registry.gauge(
+    "prefetch_last_success_timestamp_seconds",
+    "Unix time of the last successful background refresh.",
+    ["account"],
+)
+UPSTREAM_ERRORS = registry.counter(
+    "upstream_errors_total",
+    "Failed MetaStats calls, by account and exception type.",
+    ["account", "error"],
+)
+
+
+class TimedMetaStats:
+    """MetaStats wrapper recording latency, concurrency and errors of trade calls."""
+
+    def __init__(self, meta_stats):
+        self.meta_stats = meta_stats
+
+    async def get_account_trades(self, account_id: str, **kwargs):
+        UPSTREAM_INFLIGHT.inc()
+        started = time.perf_counter()
+        outcome = "ok"
+        try:
+            return await self.meta_stats.get_account_trades(account_id=account_id, **kwargs)
+        except Exception as e:
+            outcome = "error"
+            UPSTREAM_ERRORS.inc(account=account_id, error=type(e).__name__)
+            raise
+        finally:
+            UPSTREAM_INFLIGHT.dec()
+            UPSTREAM_LATENCY.observe(
+                time.perf_counter() - started, account=account_id, outcome=outcome
+            )
+
+
+meta_stats = TimedMetaStats(MetaStats(token=settings.token))
+store = TradeStore(settings.trade_store_path)
+
+ACCOUNT_IDS = list(
+    dict.fromkeys(
+        a.strip()
+        for a in [settings.account_id, *settings.account_ids.split(",")]
+        if a.strip()
+    )
+)
+DEFAULT_ACCOUNT = ACCOUNT_IDS[0] if ACCOUNT_IDS else ""
+
+CACHE_SOFT_TTL = timedelta(seconds=settings.cache_soft_ttl)
+CACHE_HARD_TTL = timedelta(seconds=max(settings.cache_hard_ttl, settings.cache_soft_ttl))
+
+caches: Dict[str, HistoryCache] = {}
+# Aggregates over each account's stored history, kept current as syncs bring new
+# trades; the stored history is loaded off the event loop on the first sync
+metrics: Dict[str, TradeMetrics] = {}
+metrics_loaded: Set[str] = set()
+metrics_locks: Dict[str, asyncio.Lock] = {}
+for account in ACCOUNT_IDS:
+    caches[account] = HistoryCache(
+        settings.history_start,
+        max_entries=settings.cache_max_entries,
+        max_bytes=settings.cache_max_bytes,
+        bucket=CACHE_SOFT_TTL,
+    )
+    metrics[account] = TradeMetrics()
+    metrics_locks[account] = asyncio.Lock()
+
+DEFAULT_PAGE_SIZE = 1000
+MIN_COMPRESS_BYTES = 1024
+PORTFOLIO_CACHE_SIZE = 16
+
+# Merged /portfolio responses by requested range, reused while the per-account
+# cache entries they were built from are still the current ones
+portfolio_cache: "OrderedDict[Tuple[Optional[str], Optional[str]], Dict[str, Any]]" = (
+    OrderedDict()
+)
+
+# Upstream refreshes in progress, one per account and cache key
+inflight: Dict[Tuple[str, CacheKey], asyncio.Task] = {}
+
+# Bounds concurrent upstream syncs across all accounts
+upstream_slots = asyncio.Semaphore(max(settings.max_concurrent_fetches, 1))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.prefetch_interval <= 0:
+        yield
+        return
+    # Fill caches before taking traffic, without letting a slow upstream block
+    # startup; each loop's first refresh joins the one started here
+    warmups = [
+        start_refresh(a, caches[a].normalize(None, None)[0]) for a in ACCOUNT_IDS
+    ]
+    tasks = [asyncio.create_task(prefetch_loop(a)) for a in ACCOUNT_IDS]
+    if warmups:
+        await asyncio.wait(warmups, timeout=settings.prefetch_startup_timeout)
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -35,56 +222,478 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
+)
+
+
+def _cache_stat(name: str) -> Dict[Tuple[str, ...], float]:
+    return {(account,): cache.stats[name] for account, cache in caches.items()}
+
+
+registry.counter(
+    "trade_cache_lookups_total",
+    "History cache lookups, by account and result.",
+    ["account", "result"],
+    collect=lambda: {
+        (account, result): cache.stats[result]
+        for account, cache in caches.items()
+        for result in ("hits", "superset_hits", "stale_hits", "misses")
+    },
+)
+registry.gauge(
+    "trade_cache_hit_ratio",
+    "Share of history cache lookups served without waiting on upstream.",
+    ["account"],
+    collect=lambda: {
+        (account,): cache.snapshot()["hit_ratio"] for account, cache in caches.items()
+    },
+)
+registry.counter(
+    "trade_cache_evictions_total",
+    "History cache entries evicted to stay within bounds.",
+    ["account"],
+    collect=lambda: _cache_stat("evictions"),
+)
+registry.gauge(
+    "trade_cache_bytes",
+    "Encoded size of the cached history payloads.",
+    ["account"],
+    collect=lambda: _cache_stat("bytes"),
+)
+registry.gauge(
+    "trade_cache_entries",
+    "Cached history ranges.",
+    ["account"],
+    collect=lambda: {(account,): len(cache.entries) for account, cache in caches.items()},
+)
+registry.gauge(
+    "trade_refreshes_in_flight",
+    "History refreshes currently running.",
+    collect=lambda: {(): len(inflight)},
 )
 
-meta_stats = MetaStats(token=settings.token)
 
-cache: Dict[str, Any] = {}
-CACHE_EXPIRY = timedelta(seconds=60)
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template so account ids do not multiply series
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        REQUEST_LATENCY.observe(
+            time.perf_counter() - started,
+            method=request.method,
+            route=path,
+            status=str(status),
+        )
+        if status >= 500:
+            REQUEST_ERRORS.inc(route=path)
+        elif status != 304 and "content-length" in response.headers:
+            RESPONSE_SIZE.observe(
+                int(response.headers["content-length"]),
+                route=path,
+                encoding=response.headers.get("content-encoding", "identity"),
+            )
+
+
+def check_account(account_id: str) -> str:
+    if account_id not in caches:
+        raise HTTPException(status_code=404, detail=f"Unknown account {account_id}")
+    return account_id
+
+
+def load_metrics(account_id: str) -> TradeMetrics:
+    loaded = TradeMetrics()
+    loaded.update(store.query(account_id, settings.history_start))
+    return loaded
+
+
+async def update_metrics(account_id: str, new_trades: List[Dict[str, Any]]):
+    """Fold newly synced trades into an account's metrics.
+
+    The first call builds them from the whole stored history in a worker
+    thread and swaps them in, so readers never see a half-built state.
+    """
+    async with metrics_locks[account_id]:
+        if account_id not in metrics_loaded:
+            metrics[account_id] = await asyncio.to_thread(load_metrics, account_id)
+            metrics_loaded.add(account_id)
+        else:
+            metrics[account_id].update(new_trades)
 
 
 async def get_full_trading_history(
-    start_time: Optional[str] = None, end_time: Optional[str] = None
+    account_id: str, start_time: Optional[str] = None, end_time: Optional[str] = None
 ):
     try:
-        start_time = start_time or "2025-01-01 00:00:00.000"
-        end_time = (
-            end_time or datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-        )
+        start_time = start_time or settings.history_start
 
-        logging.info(f"Fetching trading history from {start_time} to {end_time}")
+        async with upstream_slots:
+            # Ranges reaching before the stored history go straight upstream
+            if start_time < settings.history_start:
+                end_time = end_time or now_time()
+                logging.info(
+                    f"Fetching trading history for {account_id} from {start_time} to {end_time}"
+                )
+                return await fetch_trades(meta_stats, account_id, start_time, end_time)
 
-        trades = await meta_stats.get_account_trades(
-            account_id=settings.account_id,
-            start_time=start_time,
-            end_time=end_time,
-            update_history=True,
-        )
-        return trades
+            new_trades = await sync_account(
+                store, meta_stats, account_id, settings.history_start
+            )
+        await update_metrics(account_id, new_trades)
+        # SQLite reads and JSON decoding of a long history would block the loop
+        return await asyncio.to_thread(store.query, account_id, start_time, end_time)
     except Exception as e:
-        logging.error(f"Error fetching trading history: {e}")
+        logging.error(f"Error fetching trading history for {account_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def make_payload(trades: List[Dict[str, Any]], precompress: bool = False) -> Dict[str, Any]:
+    """Encode a trade list once, with its ETag and optionally compressed bodies."""
+    body = dumps(trades)
+    payload = {"body": body, "etag": f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'}
+    if precompress:
+        for encoding in ("gzip", "br"):
+            compressed_body(payload, encoding)
+    return payload
+
+
+def compressed_body(payload: Dict[str, Any], encoding: str) -> Optional[bytes]:
+    """Compressed body for an encoding, computed on first use and kept."""
+    if encoding not in payload:
+        if len(payload["body"]) < MIN_COMPRESS_BYTES:
+            payload[encoding] = None
+        elif encoding == "gzip":
+            payload[encoding] = gzip.compress(payload["body"], compresslevel=6)
+        elif encoding == "br" and brotli is not None:
+            payload[encoding] = brotli.compress(payload["body"], quality=5)
+        else:
+            payload[encoding] = None
+    return payload[encoding]
+
+
+def payload_response(request: Request, payload: Dict[str, Any]) -> Response:
+    """304 when the client's ETag matches, else the best accepted encoding."""
+    headers = {"ETag": payload["etag"], "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match.strip() == "*" or payload["etag"] in [
+        tag.strip().removeprefix("W/") for tag in if_none_match.split(",")
+    ]:
+        return Response(status_code=304, headers=headers)
+
+    accepted = request.headers.get("accept-encoding", "")
+    for encoding in ("br", "gzip"):
+        if encoding in accepted:
+            body = compressed_body(payload, encoding)
+            if body is not None:
+                headers["Content-Encoding"] = encoding
+                return Response(body, media_type="application/json", headers=headers)
+    return Response(payload["body"], media_type="application/json", headers=headers)
+
+
+async def refresh_cache(account_id: str, cache_key: CacheKey) -> Dict[str, Any]:
+    result = sorted(
+        await get_full_trading_history(account_id, *cache_key), key=trade_time
+    )
+    # Encode and compress off the event loop, once per refresh
+    payload = await asyncio.to_thread(make_payload, result, True)
+    return caches[account_id].put(cache_key, result, payload)
+
+
+def _refresh_done(inflight_key: Tuple[str, CacheKey], task: asyncio.Task):
+    inflight.pop(inflight_key, None)
+    if not task.cancelled():
+        task.exception()  # already logged; keeps background failures from warning
+
+
+def start_refresh(account_id: str, cache_key: CacheKey) -> asyncio.Task:
+    """Return the refresh in flight for a key, starting one if there is none."""
+    inflight_key = (account_id, cache_key)
+    task = inflight.get(inflight_key)
+    if task is None:
+        task = asyncio.create_task(refresh_cache(account_id, cache_key))
+        inflight[inflight_key] = task
+        task.add_done_callback(lambda t: _refresh_done(inflight_key, t))
+    return task
+
+
+async def cached_history(
+    account_id: str, start_time: Optional[str], end_time: Optional[str]
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Cache entry serving an account's range, and the range's trades sliced from it."""
+    cache = caches[account_id]
+    try:
+        cache_key, start, end = cache.normalize(start_time, end_time)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    cache_entry = cache.get(cache_key)
+
+    # Check in-memory cache
+    age = datetime.now(timezone.utc) - cache_entry["time"] if cache_entry else None
+    if cache_entry and age < CACHE_SOFT_TTL:
+        logging.info("Serving from in-memory cache")
+        cache.stats["hits"] += 1
+        return cache_entry, cache.slice(cache_entry, start, end)
+
+    # A fresh wider range beats a stale or missing exact entry
+    superset = cache.find_superset(start, end, CACHE_SOFT_TTL)
+    if superset:
+        logging.info("Serving from a cached superset range")
+        cache.stats["superset_hits"] += 1
+        return superset, cache.slice(superset, start, end)
+
+    if cache_entry and age < CACHE_HARD_TTL:
+        logging.info("Serving stale cache while refreshing in background")
+        cache.stats["stale_hits"] += 1
+        start_refresh(account_id, cache_key)
+        return cache_entry, cache.slice(cache_entry, start, end)
+
+    # Cache miss: concurrent requests for the same key share one upstream fetch
+    cache.stats["misses"] += 1
+    cache_entry = await asyncio.shield(start_refresh(account_id, cache_key))
+    return cache_entry, cache.slice(cache_entry, start, end)
+
+
+def encode_cursor(trade: Dict[str, Any]) -> str:
+    raw = json.dumps([trade_time(trade), trade["_id"]]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def paginate(
+    trades: List[Dict[str, Any]], cursor: Optional[str], limit: int
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Keyset page of trades after ``cursor``, plus the cursor of the next page.
+
+    Cursors carry the (close time, id) of the last trade returned, so pages
+    stay stable while newer trades are appended.
+    """
+    start = 0
+    if cursor:
+        try:
+            decoded = json.loads(base64.urlsafe_b64decode(cursor))
+        except (TypeError, ValueError, binascii.Error):
+            decoded = None
+        if not (
+            isinstance(decoded, list)
+            and len(decoded) == 2
+            and all(isinstance(value, str) for value in decoded)
+        ):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        after_time, after_id = decoded
+        keys = [trade_time(t) for t in trades]
+        start = bisect_left(keys, after_time)
+        while (
+            start < len(trades)
+            and keys[start] == after_time
+            and trades[start]["_id"] <= after_id
+        ):
+            start += 1
+    page = trades[start : start + limit]
+    more = start + limit < len(trades)
+    return page, encode_cursor(page[-1]) if more and page else None
+
+
+def ndjson_lines(trades: List[Dict[str, Any]], chunk: int = 500) -> Iterator[bytes]:
+    """Serialize trades one JSON document per line, a chunk at a time."""
+    for i in range(0, len(trades), chunk):
+        yield b"".join(dumps(t) + b"\n" for t in trades[i : i + chunk])
+
+
+def history_response(
+    request: Request,
+    cache_entry: Optional[Dict[str, Any]],
+    trades: List[Dict[str, Any]],
+    limit: Optional[int],
+    cursor: Optional[str],
+    format: str,
+) -> Response:
+    paged = limit is not None or cursor is not None
+    next_cursor = None
+    if paged:
+        trades, next_cursor = paginate(trades, cursor, limit or DEFAULT_PAGE_SIZE)
+
+    if format == "ndjson":
+        return StreamingResponse(
+            ndjson_lines(trades),
+            media_type="application/x-ndjson",
+            headers={"X-Next-Cursor": next_cursor} if next_cursor else None,
+        )
+    if paged:
+        return Response(
+            dumps({"trades": trades, "next_cursor": next_cursor}),
+            media_type="application/json",
+        )
+
+    # The whole entry was requested: reuse its precomputed body and ETag
+    if cache_entry and trades is cache_entry["data"] and cache_entry["payload"]:
+        return payload_response(request, cache_entry["payload"])
+    return payload_response(request, make_payload(trades))
+
+
 @app.get("/")
 async def trading_history(
-    start_time: Optional[str] = None, end_time: Optional[str] = None
+    request: Request,
+    start_time: Optional[str] = None,
+    end_time: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=10000),
+    cursor: Optional[str] = None,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
 ):
-    cache_key = f"{start_time}_{end_time}"
+    return await account_history(
+        request, DEFAULT_ACCOUNT, start_time, end_time, limit, cursor, format
+    )
+
+
+@app.get("/accounts")
+async def accounts():
+    return ACCOUNT_IDS
+
+
+@app.get("/accounts/{account_id}")
+async def account_history(
+    request: Request,
+    account_id: str,
+    start_time: Optional[str] = None,
+    end_time: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=10000),
+    cursor: Optional[str] = None,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+):
+    cache_entry, trades = await cached_history(
+        check_account(account_id), start_time, end_time
+    )
+    return history_response(request, cache_entry, trades, limit, cursor, format)
+
+
+def merge_portfolio(
+    sources: List[Dict[str, Any]], slices: List[List[Dict[str, Any]]]
+) -> Dict[str, Any]:
+    """Merged trades of every account, with their payload, oldest first."""
+    trades = list(heapq.merge(*slices, key=lambda t: (trade_time(t), t["_id"])))
+    return {"sources": sources, "data": trades, "payload": make_payload(trades, True)}
+
+
+@app.get("/portfolio")
+async def portfolio_history(
+    request: Request,
+    start_time: Optional[str] = None,
+    end_time: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=10000),
+    cursor: Optional[str] = None,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+):
+    """Trades of every account, merged oldest first."""
+    # Each account is served from its own cache; misses fetch concurrently,
+    # bounded by upstream_slots
+    results = await asyncio.gather(
+        *(cached_history(a, start_time, end_time) for a in ACCOUNT_IDS)
+    )
+    sources = [cache_entry for cache_entry, _ in results]
+    key = (start_time, end_time)
+    merged = portfolio_cache.get(key)
+    if merged is None or any(a is not b for a, b in zip(merged["sources"], sources)):
+        # Merge and encode off the event loop, once per change of any account
+        merged = await asyncio.to_thread(
+            merge_portfolio, sources, [account_trades for _, account_trades in results]
+        )
+        portfolio_cache[key] = merged
+        while len(portfolio_cache) > PORTFOLIO_CACHE_SIZE:
+            portfolio_cache.popitem(last=False)
+    portfolio_cache.move_to_end(key)
+    return history_response(request, merged, merged["data"], limit, cursor, format)
+
+
+def prefetch_delay(failures: int) -> float:
+    """Seconds until the next refresh: jittered interval, or exponential backoff."""
+    if failures:
+        delay = min(
+            settings.prefetch_interval * 2 ** failures, settings.prefetch_max_backoff
+        )
+    else:
+        delay = settings.prefetch_interval
+    # Jitter keeps accounts (and replicas) from refreshing in lockstep
+    return delay * random.uniform(1 - settings.prefetch_jitter, 1 + settings.prefetch_jitter)
+
+
+async def prefetch_loop(account_id: str):
+    """Keep an account's default history range fresh in the background.
+
+    Refreshes go through ``start_refresh``, so they coalesce with any
+    request-driven refresh of the same range already in flight.
+    """
+    cache_key, _, _ = caches[account_id].normalize(None, None)
+    failures = 0
+    while True:
+        try:
+            await start_refresh(account_id, cache_key)
+        except Exception as e:
+            failures += 1
+            PREFETCH_RUNS.inc(account=account_id, outcome="error")
+            logging.warning(f"Prefetch for {account_id} failed ({failures} in a row): {e}")
+        else:
+            failures = 0
+            PREFETCH_RUNS.inc(account=account_id, outcome="ok")
+            PREFETCH_LAST_SUCCESS.set(time.time(), account=account_id)
+        await asyncio.sleep(prefetch_delay(failures))
+
+
+async def ensure_synced(account_id: str):
+    """Refresh an account's default history range if it is older than the soft TTL."""
+    cache = caches[account_id]
+    cache_key, _, _ = cache.normalize(None, None)
     cache_entry = cache.get(cache_key)
+    if (
+        cache_entry is None
+        or datetime.now(timezone.utc) - cache_entry["time"] >= CACHE_SOFT_TTL
+    ):
+        await asyncio.shield(start_refresh(account_id, cache_key))
+
+
+async def account_metrics(account_id: Optional[str]) -> TradeMetrics:
+    account_id = check_account(account_id or DEFAULT_ACCOUNT)
+    await ensure_synced(account_id)
+    return metrics[account_id]
+
+
+@app.get("/stats/summary")
+async def stats_summary(account_id: Optional[str] = None):
+    return (await account_metrics(account_id)).summary()
+
+
+@app.get("/stats/equity")
+async def stats_equity(
+    period: str = Query("daily", pattern="^(trade|daily|monthly)$"),
+    account_id: Optional[str] = None,
+):
+    return (await account_metrics(account_id)).equity_curve(period)
+
+
+@app.get("/stats/pnl")
+async def stats_pnl(
+    period: str = Query("daily", pattern="^(daily|monthly)$"),
+    account_id: Optional[str] = None,
+):
+    return (await account_metrics(account_id)).pnl(period)
+
+
+@app.get("/stats/symbols")
+async def stats_symbols(account_id: Optional[str] = None):
+    return (await account_metrics(account_id)).by_symbol()
 
-    # Check in-memory cache
-    if cache_entry and datetime.now(timezone.utc) - cache_entry["time"] < CACHE_EXPIRY:
-        logging.info("Serving from in-memory cache")
-        return cache_entry["data"]
 
-    # Fetch new data if cache miss
-    result = await get_full_trading_history(start_time, end_time)
+@app.get("/cache/stats")
+async def cache_stats():
+    return {account_id: cache.snapshot() for account_id, cache in caches.items()}
 
-    # Store in cache
-    cache[cache_key] = {"data": result, "time": datetime.now(timezone.utc)}
 
-    return result
+@app.get("/metrics")
+async def prometheus_metrics():
+    return Response(registry.expose(), media_type=registry.content_type)
 
 
 if __name__ == "__main__":
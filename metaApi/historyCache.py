@@ -0,0 +1,168 @@
+import json
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from tradeStore import TIME_FORMAT, format_time, trade_time
+
+INPUT_FORMATS = (TIME_FORMAT, "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d")
+
+CacheKey = Tuple[str, Optional[str]]
+
+
+def _parse(value: str) -> Optional[datetime]:
+    for fmt in INPUT_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+class HistoryCache:
+    """Size-bounded LRU cache of trade history ranges.
+
+    Requested ranges are widened to ``bucket``-aligned keys (start floored,
+    end ceiled), so clients passing their own millisecond "now" share an
+    entry, and results are sliced back to the exact range on the way out.
+    A request without a fresh exact entry is answered from any fresh cached
+    range that contains it. Entries are evicted least-recently-used first
+    once ``max_entries`` or ``max_bytes`` (JSON-encoded size) is exceeded.
+    """
+
+    def __init__(
+        self,
+        default_start: str,
+        max_entries: int = 256,
+        max_bytes: int = 64 * 1024 * 1024,
+        bucket: timedelta = timedelta(seconds=60),
+    ):
+        self.default_start = default_start
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bucket = bucket
+        self.entries: "OrderedDict[CacheKey, Dict[str, Any]]" = OrderedDict()
+        self.stats = {
+            "hits": 0,
+            "superset_hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "bytes": 0,
+        }
+
+    def _align(self, value: str, up: bool) -> str:
+        parsed = _parse(value)
+        if parsed is None:
+            return value
+        step = self.bucket.total_seconds()
+        epoch = parsed.replace(tzinfo=timezone.utc).timestamp()
+        aligned = (-(-epoch // step) if up else epoch // step) * step
+        return format_time(datetime.fromtimestamp(aligned, timezone.utc))
+
+    def _canonical(self, value: str) -> str:
+        parsed = _parse(value)
+        if parsed is None:
+            raise ValueError(f"Invalid time {value!r}")
+        return format_time(parsed)
+
+    def normalize(
+        self, start_time: Optional[str], end_time: Optional[str]
+    ) -> Tuple[CacheKey, str, Optional[str]]:
+        """Return the bucket key plus the exact (defaulted) start and end.
+
+        Start and end are returned in the canonical ``format_time`` form,
+        as slicing compares them with stored times as strings. Raises
+        ValueError for times in none of the ``INPUT_FORMATS``.
+        """
+        start = self._canonical(start_time or self.default_start)
+        end_time = end_time and self._canonical(end_time)
+        key_start = self._align(start, up=False)
+        if start >= self.default_start:
+            # Do not widen a stored-history request to before the stored history
+            key_start = max(key_start, self.default_start)
+        key = (key_start, end_time and self._align(end_time, up=True))
+        return key, start, end_time
+
+    def get(self, key: CacheKey) -> Optional[Dict[str, Any]]:
+        """Exact entry for a key, marking it recently used."""
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def find_superset(
+        self, start: str, end: Optional[str], max_age: timedelta
+    ) -> Optional[Dict[str, Any]]:
+        """A fresh cached entry whose range contains ``[start, end)``."""
+        now = datetime.now(timezone.utc)
+        for key, entry in reversed(self.entries.items()):
+            entry_start, entry_end = key
+            if now - entry["time"] >= max_age or entry_start > start:
+                continue
+            if entry_end is None or (end is not None and end <= entry_end):
+                self.entries.move_to_end(key)
+                return entry
+        return None
+
+    @staticmethod
+    def slice(entry: Dict[str, Any], start: str, end: Optional[str]) -> List[Any]:
+        """Trades of an entry with ``start <= close time < end``."""
+        keys = entry["keys"]
+        lo = bisect_left(keys, start)
+        hi = len(keys) if end is None else bisect_left(keys, end)
+        if lo == 0 and hi == len(keys):
+            return entry["data"]
+        return entry["data"][lo:hi]
+
+    def put(
+        self,
+        key: CacheKey,
+        data: List[Dict[str, Any]],
+        payload: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Store a range's trades and evict down to the configured bounds.
+
+        ``payload`` holds pre-encoded response bodies for the whole range;
+        when given, its encoded sizes are what count towards ``max_bytes``.
+        """
+        data = sorted(data, key=trade_time)
+        if payload is not None:
+            size = sum(len(v) for v in payload.values() if isinstance(v, bytes))
+        else:
+            size = len(json.dumps(data, default=str))
+        entry = {
+            "data": data,
+            "keys": [trade_time(t) for t in data],
+            "time": datetime.now(timezone.utc),
+            "payload": payload,
+            "bytes": size,
+        }
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.stats["bytes"] -= old["bytes"]
+        self.entries[key] = entry
+        self.stats["bytes"] += entry["bytes"]
+
+        while len(self.entries) > 1 and (
+            len(self.entries) > self.max_entries or self.stats["bytes"] > self.max_bytes
+        ):
+            _, evicted = self.entries.popitem(last=False)
+            self.stats["bytes"] -= evicted["bytes"]
+            self.stats["evictions"] += 1
+        return entry
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters plus current entry count and hit ratio."""
+        lookups = (
+            self.stats["hits"]
+            + self.stats["superset_hits"]
+            + self.stats["stale_hits"]
+            + self.stats["misses"]
+        )
+        return {
+            **self.stats,
+            "entries": len(self.entries),
+            "hit_ratio": (lookups - self.stats["misses"]) / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,147 @@
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from tradeStore import TIME_FORMAT, trade_time
+
+SYMBOL_COLUMNS = ["trades", "wins", "gross_profit", "gross_loss", "net_profit", "volume"]
+
+
+class TradeMetrics:
+    """Performance aggregates maintained incrementally from closed trades.
+
+    New trades are folded into running daily PnL and per-symbol totals and
+    appended to the equity curve, so an update costs time proportional to
+    the new trades rather than the whole history. Derived results are
+    memoized until the next update that adds trades.
+    """
+
+    def __init__(self):
+        self.ids = set()
+        self.equity = pd.Series(dtype=np.float64, index=pd.DatetimeIndex([]))
+        self.daily = pd.Series(dtype=np.float64, index=pd.DatetimeIndex([]))
+        self.symbols = pd.DataFrame(columns=SYMBOL_COLUMNS, dtype=np.float64)
+        self._memo: Dict[str, Any] = {}
+
+    def update(self, trades: List[Dict[str, Any]]) -> int:
+        """Fold unseen trades into the aggregates; returns how many were added."""
+        new = [t for t in trades if t.get("closeTime") and t["_id"] not in self.ids]
+        if not new:
+            return 0
+        self.ids.update(t["_id"] for t in new)
+        self._memo.clear()
+
+        df = pd.DataFrame(
+            {
+                "time": pd.to_datetime([trade_time(t) for t in new], format=TIME_FORMAT),
+                "symbol": [t.get("symbol") or "" for t in new],
+                "profit": np.array([t.get("profit") or 0.0 for t in new], dtype=np.float64),
+                "volume": np.array([t.get("volume") or 0.0 for t in new], dtype=np.float64),
+            }
+        ).sort_values("time", kind="stable")
+
+        profit = df["profit"].to_numpy()
+        steps = pd.Series(profit, index=pd.DatetimeIndex(df["time"]))
+        if self.equity.empty or steps.index[0] >= self.equity.index[-1]:
+            start = self.equity.iloc[-1] if not self.equity.empty else 0.0
+            self.equity = pd.concat([self.equity, steps.cumsum() + start])
+        else:
+            # Late trade: re-sort the increments and rebuild the running sum
+            increments = pd.concat([self.equity.diff().fillna(self.equity), steps])
+            self.equity = increments.sort_index(kind="stable").cumsum()
+
+        day_pnl = steps.groupby(steps.index.normalize()).sum()
+        self.daily = self.daily.add(day_pnl, fill_value=0.0).sort_index()
+
+        grouped = (
+            df.assign(
+                trades=1.0,
+                wins=(profit > 0).astype(np.float64),
+                gross_profit=np.where(profit > 0, profit, 0.0),
+                gross_loss=np.where(profit < 0, -profit, 0.0),
+                net_profit=profit,
+            )
+            .groupby("symbol")[SYMBOL_COLUMNS]
+            .sum()
+        )
+        self.symbols = self.symbols.add(grouped, fill_value=0.0)
+        return len(new)
+
+    def _cached(self, key, compute):
+        if key not in self._memo:
+            self._memo[key] = compute()
+        return self._memo[key]
+
+    @staticmethod
+    def _ratios(totals: pd.Series) -> Dict[str, Optional[float]]:
+        trades = totals["trades"]
+        return {
+            "trades": int(trades),
+            "win_rate": totals["wins"] / trades if trades else None,
+            "profit_factor": (
+                totals["gross_profit"] / totals["gross_loss"] if totals["gross_loss"] else None
+            ),
+            "net_profit": totals["net_profit"],
+            "gross_profit": totals["gross_profit"],
+            "gross_loss": totals["gross_loss"],
+            "volume": totals["volume"],
+        }
+
+    def _drawdown(self) -> pd.Series:
+        peak = np.maximum.accumulate(np.maximum(self.equity.to_numpy(), 0.0))
+        return pd.Series(peak - self.equity.to_numpy(), index=self.equity.index)
+
+    def summary(self) -> Dict[str, Any]:
+        """Win rate, profit factor, net profit and maximum drawdown."""
+
+        def compute():
+            totals = self.symbols.sum().reindex(SYMBOL_COLUMNS, fill_value=0.0)
+            result = self._ratios(totals)
+            drawdown = self._drawdown()
+            result["max_drawdown"] = float(drawdown.max()) if len(drawdown) else 0.0
+            result["max_drawdown_time"] = (
+                drawdown.idxmax().strftime(TIME_FORMAT)[:-3] if len(drawdown) else None
+            )
+            return result
+
+        return self._cached("summary", compute)
+
+    def equity_curve(self, period: str = "daily") -> List[Dict[str, Any]]:
+        """Equity and drawdown per trade, or at the close of each day/month."""
+
+        def compute():
+            curve = pd.DataFrame({"equity": self.equity, "drawdown": self._drawdown()})
+            if period != "trade" and not curve.empty:
+                curve = curve.resample("D" if period == "daily" else "MS").last().dropna()
+            return [
+                {"time": t.strftime(TIME_FORMAT)[:-3], "equity": e, "drawdown": d}
+                for t, e, d in zip(curve.index, curve["equity"], curve["drawdown"])
+            ]
+
+        return self._cached(f"equity_{period}", compute)
+
+    def pnl(self, period: str = "daily") -> List[Dict[str, Any]]:
+        """Net profit per day or per month."""
+
+        def compute():
+            series = self.daily
+            if period == "monthly" and not series.empty:
+                series = series.resample("MS").sum()
+            fmt = "%Y-%m" if period == "monthly" else "%Y-%m-%d"
+            return [{"period": t.strftime(fmt), "pnl": v} for t, v in series.items()]
+
+        return self._cached(f"pnl_{period}", compute)
+
+    def by_symbol(self) -> List[Dict[str, Any]]:
+        """Per-symbol trade count, win rate, profit factor and net profit."""
+
+        def compute():
+            return [
+                {"symbol": symbol, **self._ratios(row)}
+                for symbol, row in self.symbols.sort_values(
+                    "net_profit", ascending=False
+                ).iterrows()
+            ]
+
+        return self._cached("symbols", compute)
@@ -0,0 +1,178 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+PAGE_SIZE = 1000
+
+
+def format_time(value: datetime) -> str:
+    """Format a datetime the way MetaStats expects (millisecond precision)."""
+    return value.strftime(TIME_FORMAT)[:-3]
+
+
+def parse_time(value: str) -> datetime:
+    return datetime.strptime(value, TIME_FORMAT)
+
+
+def now_time() -> str:
+    return format_time(datetime.now(timezone.utc))
+
+
+def trade_time(trade: Dict[str, Any]) -> str:
+    """Sort/index key of a trade: its close time, or open time while open."""
+    return trade.get("closeTime") or trade.get("openTime") or ""
+
+
+class TradeStore:
+    """SQLite store of historical trades keyed by account and trade id.
+
+    Trades are indexed by close time so any ``start_time``/``end_time``
+    window is answered locally. ``sync_state`` remembers, per account, from
+    when history was loaded and up to when it has been synced.
+    """
+
+    def __init__(self, path: str = "trades.db"):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS trades (
+                    account_id TEXT NOT NULL,
+                    id TEXT NOT NULL,
+                    close_time TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (account_id, id)
+                );
+                CREATE INDEX IF NOT EXISTS trades_by_time
+                    ON trades (account_id, close_time, id);
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    account_id TEXT PRIMARY KEY,
+                    history_start TEXT NOT NULL,
+                    synced_until TEXT NOT NULL
+                );
+                """
+            )
+
+    def upsert(self, account_id: str, trades: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insert or update trades; returns the ones not stored before."""
+        if not trades:
+            return []
+        with self.lock, self.conn:
+            known = set()
+            ids = [t["_id"] for t in trades]
+            for i in range(0, len(ids), 500):
+                chunk = ids[i : i + 500]
+                rows = self.conn.execute(
+                    f"SELECT id FROM trades WHERE account_id = ? AND id IN ({','.join('?' * len(chunk))})",
+                    [account_id, *chunk],
+                )
+                known.update(row[0] for row in rows)
+            self.conn.executemany(
+                """
+                INSERT INTO trades (account_id, id, close_time, data) VALUES (?, ?, ?, ?)
+                ON CONFLICT (account_id, id) DO UPDATE
+                SET close_time = excluded.close_time, data = excluded.data
+                """,
+                [(account_id, t["_id"], trade_time(t), json.dumps(t)) for t in trades],
+            )
+        return [t for t in trades if t["_id"] not in known]
+
+    def query(
+        self,
+        account_id: str,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Trades with ``start_time <= close time < end_time``, oldest first."""
+        sql = "SELECT data FROM trades WHERE account_id = ?"
+        params: List[Any] = [account_id]
+        if start_time:
+            sql += " AND close_time >= ?"
+            params.append(start_time)
+        if end_time:
+            sql += " AND close_time < ?"
+            params.append(end_time)
+        sql += " ORDER BY close_time, id"
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def get_state(self, account_id: str) -> Optional[Dict[str, str]]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT history_start, synced_until FROM sync_state WHERE account_id = ?",
+                (account_id,),
+            ).fetchone()
+        return {"history_start": row[0], "synced_until": row[1]} if row else None
+
+    def set_state(self, account_id: str, history_start: str, synced_until: str):
+        with self.lock, self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO sync_state (account_id, history_start, synced_until) VALUES (?, ?, ?)
+                ON CONFLICT (account_id) DO UPDATE
+                SET history_start = excluded.history_start, synced_until = excluded.synced_until
+                """,
+                (account_id, history_start, synced_until),
+            )
+
+
+async def fetch_trades(
+    meta_stats, account_id: str, start_time: str, end_time: str
+) -> List[Dict[str, Any]]:
+    """Download every trade in a window, following MetaStats pagination."""
+    trades: List[Dict[str, Any]] = []
+    while True:
+        page = await meta_stats.get_account_trades(
+            account_id=account_id,
+            start_time=start_time,
+            end_time=end_time,
+            update_history=True,
+            limit=PAGE_SIZE,
+            offset=len(trades),
+        )
+        trades.extend(page)
+        if len(page) < PAGE_SIZE:
+            return trades
+
+
+_sync_locks: Dict[str, asyncio.Lock] = {}
+
+
+async def sync_account(
+    store: TradeStore,
+    meta_stats,
+    account_id: str,
+    history_start: str,
+    overlap: timedelta = timedelta(days=1),
+) -> List[Dict[str, Any]]:
+    """Bring the store up to date for an account; returns newly seen trades.
+
+    The first call loads everything since ``history_start``. Later calls
+    only fetch from the last sync minus ``overlap``, which covers trades
+    whose broker-time close lands slightly before the previous sync.
+    """
+    lock = _sync_locks.setdefault(account_id, asyncio.Lock())
+    async with lock:
+        state = store.get_state(account_id)
+        end_time = now_time()
+        if state is None or state["history_start"] > history_start:
+            start_time = history_start
+        else:
+            start_time = max(
+                history_start,
+                format_time(parse_time(state["synced_until"]) - overlap),
+            )
+
+        logging.info(f"Syncing trades for {account_id} from {start_time} to {end_time}")
+        trades = await fetch_trades(meta_stats, account_id, start_time, end_time)
+        new_trades = await asyncio.to_thread(store.upsert, account_id, trades)
+        store.set_state(account_id, history_start, end_time)
+        logging.info(f"Stored {len(new_trades)} new trades for {account_id}")
+        return new_trades
@@ -0,0 +1,89 @@
+import numpy as np
+
+DEFAULT_BANDS = (0.001, 0.005, 0.01)  # 0.1%, 0.5% and 1% from mid
+DEFAULT_SIZES = (1.0, 5.0, 10.0)
+
+
+def parse_levels(levels):
+    """Convert ``[[price, qty], ...]`` string pairs into an (n, 2) float64 array."""
+    if not len(levels):
+        return np.empty((0, 2), dtype=np.float64)
+    return np.asarray(levels, dtype=np.float64).reshape(-1, 2)
+
+
+def parse_order_book(order_book):
+    """Parse a Binance depth response into bid and ask arrays.
+
+    Bids come best (highest) first and asks best (lowest) first, as Binance
+    sends them.
+    """
+    return parse_levels(order_book["bids"]), parse_levels(order_book["asks"])
+
+
+def cumulative_depth(levels):
+    """Cumulative quantity from the best level outwards."""
+    return np.cumsum(levels[:, 1])
+
+
+def band_depth(bids, asks, mid, bands=DEFAULT_BANDS):
+    """Bid and ask quantity resting within each fractional band of mid."""
+    bands = np.asarray(bands, dtype=np.float64)
+    bid_cum = np.concatenate(([0.0], cumulative_depth(bids)))
+    ask_cum = np.concatenate(([0.0], cumulative_depth(asks)))
+    # Bids are descending, so search on negated prices
+    bid_idx = np.searchsorted(-bids[:, 0], -mid * (1 - bands), side="right")
+    ask_idx = np.searchsorted(asks[:, 0], mid * (1 + bands), side="right")
+    return bid_cum[bid_idx], ask_cum[ask_idx]
+
+
+def vwap_to_fill(levels, sizes=DEFAULT_SIZES):
+    """Average price paid to fill each size by walking the book.
+
+    Pass asks for buys and bids for sells. Sizes deeper than the book give NaN.
+    """
+    sizes = np.asarray(sizes, dtype=np.float64)
+    prices, qtys = levels[:, 0], levels[:, 1]
+    cum_qty = np.cumsum(qtys)
+    cum_notional = np.cumsum(prices * qtys)
+    idx = np.searchsorted(cum_qty, sizes, side="left")
+    fillable = idx < len(qtys)
+    idx = np.minimum(idx, len(qtys) - 1)
+    prev_qty = np.where(idx > 0, cum_qty[idx - 1], 0.0)
+    prev_notional = np.where(idx > 0, cum_notional[idx - 1], 0.0)
+    notional = prev_notional + (sizes - prev_qty) * prices[idx]
+    return np.where(fillable, notional / sizes, np.nan)
+
+
+def analyze_order_book(bids, asks, bands=DEFAULT_BANDS, sizes=DEFAULT_SIZES):
+    """Compute spread, microprice, imbalance by band and VWAP-to-fill."""
+    best_bid, bid_qty = bids[0]
+    best_ask, ask_qty = asks[0]
+    mid = (best_bid + best_ask) / 2
+    total_bid = bids[:, 1].sum()
+    total_ask = asks[:, 1].sum()
+    bid_band, ask_band = band_depth(bids, asks, mid, bands)
+    band_total = bid_band + ask_band
+
+    return {
+        "best_bid": best_bid,
+        "best_ask": best_ask,
+        "mid": mid,
+        "spread": best_ask - best_bid,
+        "spread_bps": (best_ask - best_bid) / mid * 1e4,
+        "microprice": (best_bid * ask_qty + best_ask * bid_qty) / (bid_qty + ask_qty),
+        "total_bid_volume": total_bid,
+        "total_ask_volume": total_ask,
+        "imbalance": total_bid - total_ask,
+        "bands": {
+            band: {
+                "bid_volume": bid_band[i],
+                "ask_volume": ask_band[i],
+                "imbalance": (
+                    (bid_band[i] - ask_band[i]) / band_total[i] if band_total[i] else 0.0
+                ),
+            }
+            for i, band in enumerate(bands)
+        },
+        "vwap_buy": dict(zip(sizes, vwap_to_fill(asks, sizes))),
+        "vwap_sell": dict(zip(sizes, vwap_to_fill(bids, sizes))),
+    }
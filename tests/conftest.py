@@ -0,0 +1,72 @@
+import asyncio
+import importlib
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+# The scripts import their sibling modules by name, as when run directly
+ROOT = os.path.dirname(os.path.dirname(__file__))
+for directory in ("", "MT5", "metaApi", os.path.join("metaApi", "CopyFactory")):
+    sys.path.insert(0, os.path.join(ROOT, directory))
+
+
+class FakeMetaStats:
+    """Stand-in for MetaStats serving generated closed trades after a delay."""
+
+    def __init__(self, count=200, delay=0.05):
+        start = datetime(2025, 1, 2)
+        self.trades = []
+        for i in range(count):
+            opened = start + timedelta(minutes=7 * i)
+            self.trades.append(
+                {
+                    "_id": f"t{i:05d}",
+                    "accountId": "acc",
+                    "symbol": "XAUUSD" if i % 2 else "BTCUSD",
+                    "type": "DEAL_TYPE_BUY",
+                    "volume": 0.1,
+                    "profit": float(i % 7 - 3),
+                    "gain": 0.01,
+                    "success": "won" if i % 7 > 3 else "lost",
+                    "openTime": opened.strftime("%Y-%m-%d %H:%M:%S.000"),
+                    "closeTime": (opened + timedelta(minutes=3)).strftime("%Y-%m-%d %H:%M:%S.000"),
+                }
+            )
+        self.delay = delay
+        self.calls = []
+
+    async def get_account_trades(
+        self, account_id, start_time, end_time, update_history=True, limit=1000, offset=0
+    ):
+        self.calls.append((account_id, start_time, end_time, offset))
+        await asyncio.sleep(self.delay)
+        trades = [t for t in self.trades if start_time <= t["closeTime"] < end_time]
+        return trades[offset : offset + limit]
+
+
+@pytest.fixture
+def fake_stats():
+    return FakeMetaStats()
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch, fake_stats):
+    """A freshly imported fastApiTrades module backed by ``fake_stats``."""
+    pytest.importorskip("fastapi")
+    pytest.importorskip("metaapi_cloud_sdk")
+    monkeypatch.setenv("METAAPI_TOKEN", "x" * 40)
+    monkeypatch.setenv("METAAPI_ACCOUNT_ID", "acc")
+    monkeypatch.setenv("METAAPI_ACCOUNT_IDS", "")
+    monkeypatch.setenv("TRADE_STORE_PATH", str(tmp_path / "trades.db"))
+    monkeypatch.setenv("PREFETCH_INTERVAL", "0")
+    sys.modules.pop("fastApiTrades", None)
+    module = importlib.import_module("fastApiTrades")
+    tradeStore = importlib.import_module("tradeStore")
+    # Sync locks belong to the event loop of the test that created them
+    monkeypatch.setattr(tradeStore, "_sync_locks", {})
+    module.meta_stats = module.TimedMetaStats(fake_stats)
+    yield module
+    module.store.conn.close()
+    sys.modules.pop("fastApiTrades", None)
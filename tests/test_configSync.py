@@ -0,0 +1,114 @@
+import asyncio
+from types import SimpleNamespace
+
+import configSync
+
+
+class FakeConfigurationApi:
+    """In-memory CopyFactory configuration API recording every write."""
+
+    def __init__(self, strategies=(), subscribers=(), failing=()):
+        self.strategies = {s["_id"]: dict(s) for s in strategies}
+        self.subscribers = {s["_id"]: dict(s) for s in subscribers}
+        self.failing = set(failing)
+        self.updates = []
+        self.next_id = 0
+
+    async def get_strategies_with_infinite_scroll_pagination(self):
+        return [dict(s) for s in self.strategies.values()]
+
+    async def get_subscribers_with_infinite_scroll_pagination(self):
+        return [dict(s) for s in self.subscribers.values()]
+
+    async def generate_strategy_id(self):
+        self.next_id += 1
+        return {"id": f"NEW{self.next_id}"}
+
+    async def update_strategy(self, strategy_id, body):
+        self.updates.append(("strategy", strategy_id))
+        if strategy_id in self.failing:
+            raise RuntimeError("rejected")
+        self.strategies[strategy_id] = {"_id": strategy_id, **body}
+
+    async def update_subscriber(self, account_id, body):
+        self.updates.append(("subscriber", account_id))
+        self.subscribers[account_id] = {"_id": account_id, **body}
+
+
+class FakeApi:
+    def __init__(self, roles):
+        async def get_account(account_id):
+            return SimpleNamespace(id=account_id, copy_factory_roles=roles.get(account_id, []))
+
+        self.metatrader_account_api = SimpleNamespace(get_account=get_account)
+
+    @staticmethod
+    def format_error(err):
+        return err
+
+
+ROLES = {"X": ["PROVIDER"], "Y": ["PROVIDER"], "s1": ["SUBSCRIBER"], "s2": ["SUBSCRIBER"]}
+
+
+def sync(configuration_api, config, **kwargs):
+    return asyncio.run(
+        configSync.sync_config(FakeApi(ROLES), configuration_api, config, **kwargs)
+    )
+
+
+def by_id(results, kind):
+    return {r["id"]: r for r in results if r["kind"] == kind}
+
+
+def config_for(*names, account="X"):
+    return {
+        "strategies": [{"name": name, "accountId": account} for name in names],
+        "subscribers": [
+            {"accountId": f"s{i}", "subscriptions": [{"strategy": name, "multiplier": 1}]}
+            for i, name in enumerate(names, 1)
+        ],
+    }
+
+
+def test_exact_name_match_wins_over_rename_fallback():
+    api = FakeConfigurationApi([{"_id": "S1", "accountId": "X", "name": "B"}])
+    results = sync(api, config_for("A", "B"))
+
+    strategies = by_id(results, "strategy")
+    assert strategies["S1"]["action"] == "unchanged"
+    assert strategies["NEW1"]["action"] == "create"
+    assert api.strategies["S1"]["name"] == "B"
+    assert api.strategies["NEW1"]["name"] == "A"
+    assert api.subscribers["s1"]["subscriptions"][0]["strategyId"] == "NEW1"
+    assert api.subscribers["s2"]["subscriptions"][0]["strategyId"] == "S1"
+
+
+def test_renamed_strategy_falls_back_to_its_account():
+    api = FakeConfigurationApi([{"_id": "S1", "accountId": "X", "name": "Old"}])
+    results = sync(api, config_for("A"))
+
+    assert by_id(results, "strategy")["S1"]["action"] == "update"
+    assert api.strategies["S1"]["name"] == "A"
+    assert len(api.strategies) == 1
+
+
+def test_unchanged_entries_make_no_calls():
+    api = FakeConfigurationApi()
+    config = config_for("A", "B")
+    sync(api, config)
+    api.updates.clear()
+
+    results = sync(api, config)
+    assert api.updates == []
+    assert {r["status"] for r in results} == {"unchanged"}
+
+
+def test_subscribers_of_a_failed_strategy_are_skipped():
+    api = FakeConfigurationApi(failing={"NEW1"})
+    results = sync(api, config_for("A", "B"))
+
+    assert by_id(results, "strategy")["NEW1"]["status"] == "failed"
+    subscribers = by_id(results, "subscriber")
+    assert subscribers["s1"]["status"] == "skipped"
+    assert subscribers["s2"]["status"] == "applied"
+    assert ("subscriber", "s1") not in api.updates
@@ -0,0 +1,129 @@
+import json
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+import pytest
+
+pytest.importorskip("requests")
+
+import dealDownloader  # noqa: E402
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+END = START + timedelta(days=28)
+DEALS = [
+    {
+        "id": str(i),
+        "type": "DEAL_TYPE_BUY",
+        "time": (START + timedelta(minutes=30 * i)).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+    }
+    for i in range(28 * 48)
+]
+BROKEN_WINDOW = "2025-01-15"
+
+
+@pytest.fixture
+def api():
+    """Local stand-in for the MetaApi history-deals endpoint.
+
+    Every fifth request answers 503 with ``Retry-After: 0`` and windows
+    starting on ``state["broken"]`` answer 404 until it is cleared.
+    """
+    state = {"calls": 0, "throttled": 0, "broken": BROKEN_WINDOW}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            start, end = (unquote(part) for part in url.path.split("/")[-2:])
+            query = parse_qs(url.query)
+            with lock:
+                state["calls"] += 1
+                throttle = state["calls"] % 5 == 0
+                if throttle:
+                    state["throttled"] += 1
+            if throttle:
+                self.send_response(503)
+                self.send_header("Retry-After", "0")
+                self.end_headers()
+                return
+            if self.headers["auth-token"] != "token" or (
+                state["broken"] and start.startswith(state["broken"])
+            ):
+                self.send_response(404)
+                self.end_headers()
+                return
+            selected = [d for d in DEALS if start <= d["time"] < end]
+            offset, limit = int(query["offset"][0]), int(query["limit"][0])
+            body = json.dumps(selected[offset : offset + limit]).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", state
+    server.shutdown()
+    server.server_close()
+
+
+def download(base_url, path):
+    return dealDownloader.download_deals(
+        "acc",
+        "token",
+        START,
+        END,
+        path=path,
+        window=timedelta(days=7),
+        max_workers=2,
+        base_url=base_url,
+    )
+
+
+def test_failed_window_is_fetched_on_rerun(api, tmp_path):
+    base_url, state = api
+    path = str(tmp_path / "deals.ndjson")
+
+    with pytest.raises(RuntimeError, match="1 of 4 windows failed"):
+        download(base_url, path)
+    with open(f"{path}.checkpoint") as f:
+        checkpoint = json.load(f)
+    assert len(checkpoint["done"]) == 3
+    assert os.path.getsize(path) == checkpoint["offset"]
+
+    # A write torn by the interruption is cut off on resume
+    with open(path, "ab") as f:
+        f.write(b'{"id": "torn')
+    state["broken"] = None
+    result = download(base_url, path)
+
+    assert result["windows"] == 4
+    assert result["resumed_windows"] == 3
+    assert result["deals"] == sum(1 for d in DEALS if "2025-01-15" <= d["time"] < "2025-01-22")
+    ids = [d["id"] for d in dealDownloader.read_deals(path)]
+    assert sorted(ids, key=int) == [d["id"] for d in DEALS]
+    assert state["throttled"] > 0
+    assert not os.path.exists(f"{path}.checkpoint")
+
+
+def test_missing_output_restarts_download(api, tmp_path):
+    base_url, state = api
+    path = str(tmp_path / "deals.ndjson")
+
+    with pytest.raises(RuntimeError):
+        download(base_url, path)
+    os.remove(path)
+    state["broken"] = None
+    result = download(base_url, path)
+
+    assert result["resumed_windows"] == 0
+    assert result["deals"] == len(DEALS)
+    assert len(list(dealDownloader.read_deals(path))) == len(DEALS)
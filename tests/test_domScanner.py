@@ -0,0 +1,115 @@
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+pytest.importorskip("requests")
+
+import domScanner  # noqa: E402
+
+SYMBOLS = [f"SYM{i:03d}USDT" for i in range(100)]
+INVALID = "SYM013USDT"
+EMPTY = "SYM042USDT"
+
+
+def canned_book(symbol):
+    """One level each side inside the scan band, bid size varying by symbol."""
+    if symbol == EMPTY:
+        return {"lastUpdateId": 1, "bids": [], "asks": []}
+    bid_qty = (int(symbol[3:6]) * 37) % 100 + 1
+    return {
+        "lastUpdateId": 1,
+        "bids": [["99.90", str(bid_qty)], ["90.00", "500"]],
+        "asks": [["100.10", "50"], ["110.00", "500"]],
+    }
+
+
+@pytest.fixture
+def depth_api():
+    """Local stand-in for Binance ``/api/v3/depth`` serving canned books.
+
+    ``INVALID`` answers 400 and every response reports the weight used so
+    far in ``X-MBX-USED-WEIGHT-1M``.
+    """
+    state = {"calls": 0, "used": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            symbol, limit = query["symbol"][0], int(query["limit"][0])
+            with lock:
+                state["calls"] += 1
+                state["used"] += domScanner.depth_weight(limit)
+                used = state["used"]
+            if symbol == INVALID:
+                status, body = 400, {"code": -1121, "msg": "Invalid symbol."}
+            else:
+                status, body = 200, canned_book(symbol)
+            body = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("X-MBX-USED-WEIGHT-1M", str(used))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/api/v3/depth", state
+    server.shutdown()
+    server.server_close()
+
+
+def test_scan_ranks_symbols_and_drops_failures(depth_api, caplog):
+    url, state = depth_api
+    with caplog.at_level(logging.ERROR):
+        rows = domScanner.scan(SYMBOLS, url=url, budget=domScanner.RateBudget())
+
+    assert state["calls"] == len(SYMBOLS)
+    ranked = [row["symbol"] for row in rows]
+    assert INVALID not in ranked and EMPTY not in ranked
+    expected = sorted(
+        (s for s in SYMBOLS if s not in (INVALID, EMPTY)),
+        key=lambda s: float(canned_book(s)["bids"][0][1]),
+        reverse=True,
+    )
+    assert ranked == expected
+    imbalances = [row["band_imbalance"] for row in rows]
+    assert imbalances == sorted(imbalances, reverse=True)
+    assert rows[0]["mid"] == pytest.approx(100.0)
+
+    failures = [r.getMessage() for r in caplog.records]
+    assert any(INVALID in m and "400" in m for m in failures)
+    assert any(EMPTY in m and "Empty order book" in m for m in failures)
+    assert not any("index" in m for m in failures)
+
+
+def test_back_to_back_scans_share_the_budget(depth_api):
+    url, state = depth_api
+    # Burst covers one full scan; the rest refills at 5 weight a second
+    budget = domScanner.RateBudget(weight_per_minute=800, burst=500)
+    session = domScanner.make_session()
+
+    domScanner.scan(SYMBOLS, url=url, session=session, budget=budget)
+    with budget.lock:
+        budget._refill()
+        left = budget.tokens
+    started = time.monotonic()
+    rows = domScanner.scan(SYMBOLS[:4], url=url, session=session, budget=budget)
+    elapsed = time.monotonic() - started
+
+    assert len(rows) == 4
+    assert state["calls"] == len(SYMBOLS) + 4
+    # Four weight-5 requests wait for whatever the first scan left short
+    wait = (4 * domScanner.depth_weight(100) - left) / budget.rate
+    assert wait > 1.0
+    assert elapsed >= wait - 0.1
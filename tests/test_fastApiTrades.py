@@ -0,0 +1,167 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+
+@pytest.fixture
+def client(service):
+    from fastapi.testclient import TestClient
+
+    return TestClient(service.app)
+
+
+def test_etag_revalidation_returns_304(client):
+    first = client.get("/")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "no-cache"
+
+    repeat = client.get("/", headers={"If-None-Match": etag})
+    assert repeat.status_code == 304
+    assert repeat.content == b""
+    assert repeat.headers["etag"] == etag
+
+    listed = client.get("/", headers={"If-None-Match": f'"other", W/{etag}'})
+    assert listed.status_code == 304
+    assert client.get("/", headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_gzip_body_matches_identity(client):
+    identity = client.get("/", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+
+    compressed = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in compressed.headers["vary"]
+    assert int(compressed.headers["content-length"]) < len(identity.content)
+    assert compressed.json() == identity.json()
+    assert compressed.headers["etag"] == identity.headers["etag"]
+
+
+def test_brotli_preferred_when_available(client, service):
+    pytest.importorskip("brotli")
+    response = client.get("/", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["content-encoding"] == "br"
+    assert response.json() == client.get("/", headers={"Accept-Encoding": "identity"}).json()
+
+
+def test_brotli_falls_back_without_the_module(client, service, monkeypatch):
+    monkeypatch.setattr(service, "brotli", None)
+    # A different range, so its payload is compressed without brotli
+    params = {"start_time": "2025-01-02 12:00:00.000"}
+    only_br = client.get("/", params=params, headers={"Accept-Encoding": "br"})
+    assert only_br.status_code == 200
+    assert "content-encoding" not in only_br.headers
+    both = client.get("/", params=params, headers={"Accept-Encoding": "br, gzip"})
+    assert both.headers["content-encoding"] == "gzip"
+
+
+def test_small_bodies_are_not_compressed(client):
+    response = client.get(
+        "/",
+        params={"start_time": "2025-01-02 00:00:00.000", "end_time": "2025-01-02 00:05:00.000"},
+        headers={"Accept-Encoding": "gzip"},
+    )
+    assert len(response.json()) == 1
+    assert "content-encoding" not in response.headers
+
+
+def _age(service, seconds):
+    """Make every cached entry of the default account ``seconds`` older."""
+    for entry in service.caches["acc"].entries.values():
+        entry["time"] -= timedelta(seconds=seconds)
+
+
+def test_concurrent_misses_share_one_upstream_fetch(service, fake_stats):
+    async def scenario():
+        return await asyncio.gather(
+            *(service.cached_history("acc", None, None) for _ in range(10))
+        )
+
+    results = asyncio.run(scenario())
+    assert len(fake_stats.calls) == 1
+    assert all(entry is results[0][0] for entry, _ in results)
+    assert all(len(trades) == len(fake_stats.trades) for _, trades in results)
+    assert service.caches["acc"].stats["misses"] == 10
+    assert not service.inflight
+
+
+def test_stale_entry_served_while_refreshing(service, fake_stats):
+    soft = service.CACHE_SOFT_TTL.total_seconds()
+
+    async def scenario():
+        first, _ = await service.cached_history("acc", None, None)
+        _age(service, soft + 1)
+        stale, trades = await service.cached_history("acc", None, None)
+        # Answered from the old entry before the background refresh has finished
+        assert stale is first
+        assert len(trades) == len(fake_stats.trades)
+        assert len(fake_stats.calls) == 1
+        assert len(service.inflight) == 1
+        await asyncio.gather(*service.inflight.values())
+        fresh, _ = await service.cached_history("acc", None, None)
+        return first, fresh
+
+    first, fresh = asyncio.run(scenario())
+    assert fresh is not first
+    assert len(fake_stats.calls) == 2
+    stats = service.caches["acc"].stats
+    assert (stats["misses"], stats["stale_hits"], stats["hits"]) == (1, 1, 1)
+
+
+def test_entry_past_hard_ttl_waits_for_upstream(service, fake_stats):
+    hard = service.CACHE_HARD_TTL.total_seconds()
+
+    async def scenario():
+        first, _ = await service.cached_history("acc", None, None)
+        _age(service, hard + 1)
+        second, _ = await service.cached_history("acc", None, None)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert second is not first
+    assert len(fake_stats.calls) == 2
+    assert not service.inflight
+    stats = service.caches["acc"].stats
+    assert (stats["misses"], stats["stale_hits"]) == (2, 0)
+
+
+def test_portfolio_payload_reused_until_an_account_refreshes(client, service, monkeypatch):
+    built = []
+    merge_portfolio = service.merge_portfolio
+    monkeypatch.setattr(
+        service, "merge_portfolio", lambda *args: built.append(args) or merge_portfolio(*args)
+    )
+
+    first = client.get("/portfolio", headers={"Accept-Encoding": "gzip"})
+    second = client.get("/portfolio", headers={"If-None-Match": first.headers["etag"]})
+    assert first.headers["content-encoding"] == "gzip"
+    assert second.status_code == 304
+    assert len(built) == 1
+
+    _age(service, service.CACHE_HARD_TTL.total_seconds() + 1)
+    third = client.get("/portfolio")
+    assert len(built) == 2
+    assert third.json() == first.json()
+
+
+def test_store_reads_run_off_the_event_loop(client, service, fake_stats, monkeypatch):
+    on_loop = []
+    query = service.store.query
+
+    def recording_query(*args, **kwargs):
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            on_loop.append(False)
+        return query(*args, **kwargs)
+
+    monkeypatch.setattr(service.store, "query", recording_query)
+    assert len(client.get("/").json()) == len(fake_stats.trades)
+    summary = client.get("/stats/summary")
+    assert summary.status_code == 200
+
+    assert on_loop and not any(on_loop)
+    assert len(service.metrics["acc"].ids) == len(fake_stats.trades)
@@ -0,0 +1,183 @@
+import getpass
+import itertools
+import sys
+import threading
+import time
+import types
+from types import SimpleNamespace
+
+import pytest
+
+
+class FakeMetaTrader5(types.ModuleType):
+    """Stand-in for the ``MetaTrader5`` module with a slow ``order_send``.
+
+    Tracks how many sends run at once and requotes the first close of
+    every ticket in ``requote``.
+    """
+
+    ORDER_TYPE_BUY, ORDER_TYPE_SELL = 0, 1
+    ORDER_TYPE_BUY_LIMIT, ORDER_TYPE_SELL_LIMIT = 2, 3
+    ORDER_TYPE_BUY_STOP, ORDER_TYPE_SELL_STOP = 4, 5
+    TRADE_ACTION_DEAL, TRADE_ACTION_PENDING, TRADE_ACTION_SLTP = 1, 5, 6
+    TRADE_ACTION_MODIFY, TRADE_ACTION_REMOVE = 7, 8
+    TRADE_RETCODE_REQUOTE, TRADE_RETCODE_DONE = 10004, 10009
+    TRADE_RETCODE_INVALID_VOLUME, TRADE_RETCODE_INVALID_PRICE = 10014, 10015
+    TRADE_RETCODE_PRICE_CHANGED, TRADE_RETCODE_INVALID_FILL = 10020, 10030
+    ORDER_TIME_GTC = 0
+    ORDER_FILLING_FOK, ORDER_FILLING_IOC, ORDER_FILLING_RETURN = 0, 1, 2
+    SYMBOL_FILLING_FOK, SYMBOL_FILLING_IOC = 1, 2
+    COPY_TICKS_ALL = -1
+
+    def __init__(self, send_delay=0.01):
+        super().__init__("MetaTrader5")
+        self.send_delay = send_delay
+        self.sent = []
+        self.tick_calls = []
+        self.requote = set()
+        self.active = 0
+        self.max_active = 0
+        self._orders = itertools.count(5000)
+        self._lock = threading.Lock()
+
+    def symbol_info(self, symbol):
+        return SimpleNamespace(
+            volume_min=0.01,
+            volume_step=0.01,
+            volume_max=100.0,
+            digits=2,
+            trade_tick_size=0.01,
+            point=0.01,
+            filling_mode=self.SYMBOL_FILLING_IOC,
+            visible=True,
+        )
+
+    def symbol_select(self, symbol, enable):
+        return True
+
+    def symbol_info_tick(self, symbol):
+        self.tick_calls.append(symbol)
+        return SimpleNamespace(bid=100.0, ask=100.5, time_msc=1000)
+
+    def last_error(self):
+        return (1, "Fake error")
+
+    def order_send(self, request):
+        with self._lock:
+            self.sent.append(dict(request))
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            requote = request.get("position") in self.requote
+            self.requote.discard(request.get("position"))
+        time.sleep(self.send_delay)
+        with self._lock:
+            self.active -= 1
+        if requote:
+            return SimpleNamespace(retcode=self.TRADE_RETCODE_REQUOTE, comment="Requote", order=0)
+        return SimpleNamespace(
+            retcode=self.TRADE_RETCODE_DONE, comment="Request executed", order=next(self._orders)
+        )
+
+
+@pytest.fixture
+def terminal(monkeypatch):
+    fake = FakeMetaTrader5()
+    monkeypatch.setitem(sys.modules, "MetaTrader5", fake)
+    return fake
+
+
+@pytest.fixture
+def oop(terminal, monkeypatch):
+    """metaTraderOOP imported fresh against the fake terminal."""
+    monkeypatch.setattr(getpass, "getpass", lambda *args: pytest.fail("Prompted for a password"))
+    monkeypatch.delenv("MT5_PASSWORD", raising=False)
+    sys.modules.pop("metaTraderOOP", None)
+    import metaTraderOOP
+
+    yield metaTraderOOP
+    sys.modules.pop("metaTraderOOP", None)
+
+
+def open_trade(oop, ticket, trade_symbol="BTCUSD", direction="buy", lot_size=0.1, magic=12345):
+    oop.open_trades[ticket] = {
+        "symbol": trade_symbol,
+        "direction": direction,
+        "lot_size": lot_size,
+        "tp": 0.0,
+        "sl": 0.0,
+        "type": 0 if direction == "buy" else 1,
+        "magic": magic,
+    }
+
+
+def test_execute_batch_reports_each_intent(oop, terminal):
+    tool = oop.TradingTool()
+    assert tool.account["password"] is None
+    open_trade(oop, 1)
+    open_trade(oop, 2, direction="sell", lot_size=0.3)
+
+    results = tool.execute_batch(
+        [
+            {"op": "market", "symbol": "BTCUSD", "direction": "buy", "lot_size": 0.01},
+            {"op": "market", "symbol": "BTCUSD", "direction": "sideways", "lot_size": 0.01},
+            {"op": "close", "ticket": 999},
+            {"op": "close", "ticket": 2, "fraction": 0.5},
+            {"op": "update", "ticket": 1, "tp": 110.0, "sl": 90.0},
+            {"op": "explode", "ticket": 1},
+        ]
+    )
+
+    assert [r["ok"] for r in results] == [True, False, False, True, True, False]
+    assert "Invalid direction 'sideways'" in results[1]["comment"]
+    assert "Unknown open trade 999" in results[2]["comment"]
+    assert "Unknown operation 'explode'" in results[5]["comment"]
+    assert all(r["request"] is None and r["latency_ms"] == 0.0 for r in results if not r["ok"])
+    for r in results:
+        if r["ok"]:
+            assert r["retcode"] == terminal.TRADE_RETCODE_DONE
+            assert r["latency_ms"] >= terminal.send_delay * 1000
+    assert len(terminal.sent) == 3
+    # One tick for the whole batch, shared by the open and the close
+    assert terminal.tick_calls == ["BTCUSD"]
+
+    opened = results[0]["order"]
+    assert results[0]["ticket"] == opened and oop.open_trades[opened]["lot_size"] == 0.01
+    assert results[3]["request"]["volume"] == 0.15
+    assert results[3]["request"]["price"] == 100.5
+    assert oop.open_trades[2]["lot_size"] == pytest.approx(0.15)
+    assert (oop.open_trades[1]["tp"], oop.open_trades[1]["sl"]) == (110.0, 90.0)
+
+
+def test_submit_requests_stays_within_the_pool(oop, terminal):
+    tool = oop.TradingTool()
+    intents = [
+        {"op": "market", "symbol": "BTCUSD", "direction": "buy", "lot_size": 0.01}
+        for _ in range(12)
+    ]
+
+    results = tool.execute_batch(intents, max_workers=3)
+
+    assert all(r["ok"] for r in results)
+    assert 1 < terminal.max_active <= 3
+    assert len({r["order"] for r in results}) == 12
+
+
+def test_flatten_closes_fifty_positions_in_one_call(oop, terminal):
+    tool = oop.TradingTool()
+    for ticket in range(1, 51):
+        open_trade(oop, ticket, "BTCUSD" if ticket % 2 else "XAUUSD", "buy" if ticket % 3 else "sell")
+    open_trade(oop, 99, magic=1)
+    terminal.requote = {5, 10}
+
+    report = tool.flatten(magic=12345, max_workers=8)
+
+    assert sorted(report["closed"]) == list(range(1, 51))
+    assert report["failed"] == {}
+    assert report["rounds"] == 2
+    assert report["time_to_flat_ms"] > 0
+    assert list(oop.open_trades) == [99]
+    assert terminal.max_active <= 8
+    # One tick per symbol and round, not one per position
+    assert sorted(terminal.tick_calls) == ["BTCUSD", "BTCUSD", "XAUUSD", "XAUUSD"]
+    closes = [r for r in terminal.sent if r["position"] == 3]
+    assert closes[0]["price"] == 100.5 and closes[0]["type"] == terminal.ORDER_TYPE_BUY
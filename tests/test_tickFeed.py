@@ -0,0 +1,89 @@
+import logging
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from tickFeed import TICK_DTYPE, TickFeed, compare_latency
+
+
+class RecordedTerminal:
+    """Replays a recorded tick stream through the MetaTrader5 tick API.
+
+    ``symbol_info_tick`` sleeps ``ipc_delay`` seconds to stand in for the
+    round trip to the terminal that the feed avoids.
+    """
+
+    COPY_TICKS_ALL = -1
+
+    def __init__(self, times_msc, ipc_delay=0.0):
+        self.ticks = np.zeros(len(times_msc), dtype=TICK_DTYPE)
+        self.ticks["time_msc"] = times_msc
+        self.ticks["bid"] = np.arange(len(times_msc)) + 100.0
+        self.ticks["ask"] = self.ticks["bid"] + 0.5
+        self.visible = 0  # ticks that have "arrived" so far
+        self.ipc_delay = ipc_delay
+        self.fail = False
+        self.calls = 0
+
+    def arrive(self, count):
+        self.visible = min(len(self.ticks), self.visible + count)
+
+    def symbol_info_tick(self, symbol):
+        time.sleep(self.ipc_delay)
+        tick = self.ticks[self.visible - 1]
+        return SimpleNamespace(time_msc=int(tick["time_msc"]), bid=tick["bid"], ask=tick["ask"])
+
+    def copy_ticks_from(self, symbol, date_from, count, flags):
+        self.calls += 1
+        if self.fail:
+            return None
+        seen = self.ticks[: self.visible]
+        return seen[seen["time_msc"] >= date_from * 1000][:count]
+
+    def last_error(self):
+        return (-1, "terminal: call failed")
+
+
+def test_feed_reads_past_seconds_with_more_ticks_than_a_batch():
+    # Eight ticks in one second, then one per second
+    times = [1_000_000, *range(1_001_000, 1_001_008), *range(1_002_000, 1_010_000, 1000)]
+    terminal = RecordedTerminal(times)
+    terminal.arrive(1)
+    feed = TickFeed(terminal, ["XAUUSD"], batch=3)
+    feed.poll()
+
+    terminal.arrive(len(times))
+    assert feed.poll() == len(times) - 1
+    assert feed.tick("XAUUSD").time_msc == times[-1]
+    assert list(feed.last_n("XAUUSD", len(times) - 1)["time_msc"]) == times[1:]
+    assert feed.poll() == 0
+
+
+def test_failed_copy_leaves_the_feed_stale(caplog):
+    terminal = RecordedTerminal([1_000_000, 1_000_500])
+    terminal.arrive(1)
+    feed = TickFeed(terminal, ["XAUUSD"], max_age=0.05)
+    feed.poll()
+    assert feed.tick("XAUUSD") is not None
+
+    terminal.fail = True
+    with caplog.at_level(logging.ERROR):
+        feed.poll()
+    assert "call failed" in caplog.text
+    time.sleep(0.06)
+    assert feed.tick("XAUUSD") is None
+
+
+def test_feed_quotes_faster_than_symbol_info_tick():
+    terminal = RecordedTerminal(range(1_000_000, 1_100_000, 100), ipc_delay=0.0002)
+    terminal.arrive(500)
+    feed = TickFeed(terminal, ["XAUUSD"])
+    feed.poll()
+    terminal.arrive(500)
+    feed.poll()
+
+    assert feed.tick("XAUUSD").bid == terminal.symbol_info_tick("XAUUSD").bid
+    report = compare_latency(terminal, feed, "XAUUSD", n=200)
+    assert report["feed_us"] < report["direct_us"]
+    assert report["speedup"] > 5
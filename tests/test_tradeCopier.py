@@ -0,0 +1,183 @@
+import itertools
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+from tradeCopier import Follower, TradeCopier
+
+
+class FakeTerminal:
+    """Stand-in for one MetaTrader5 terminal that keeps its own positions."""
+
+    ORDER_TYPE_BUY, ORDER_TYPE_SELL = 0, 1
+    TRADE_ACTION_DEAL, TRADE_ACTION_SLTP = 1, 6
+    TRADE_RETCODE_REQUOTE, TRADE_RETCODE_DONE, TRADE_RETCODE_PRICE_CHANGED = 10004, 10009, 10020
+    ORDER_TIME_GTC = 0
+    ORDER_FILLING_FOK, ORDER_FILLING_IOC, ORDER_FILLING_RETURN = 0, 1, 2
+    SYMBOL_FILLING_FOK, SYMBOL_FILLING_IOC = 1, 2
+
+    def __init__(self, first_ticket=1000):
+        self.positions = {}
+        self.sent = []
+        self.deals = 0
+        self._tickets = itertools.count(first_ticket)
+
+    def add_position(self, symbol, volume, direction="buy", tp=0.0, sl=0.0, magic=1, comment=""):
+        ticket = next(self._tickets)
+        self.positions[ticket] = SimpleNamespace(
+            ticket=ticket,
+            symbol=symbol,
+            type=self.ORDER_TYPE_BUY if direction == "buy" else self.ORDER_TYPE_SELL,
+            volume=volume,
+            tp=tp,
+            sl=sl,
+            magic=magic,
+            comment=comment,
+        )
+        return ticket
+
+    def symbol_info(self, symbol):
+        return SimpleNamespace(
+            volume_min=0.01,
+            volume_step=0.01,
+            volume_max=100.0,
+            digits=2,
+            trade_tick_size=0.01,
+            point=0.01,
+            filling_mode=self.SYMBOL_FILLING_IOC,
+            visible=True,
+        )
+
+    def symbol_select(self, symbol, enable):
+        return True
+
+    def symbol_info_tick(self, symbol):
+        return SimpleNamespace(bid=100.0, ask=100.5, time_msc=1000)
+
+    def account_info(self):
+        return SimpleNamespace(balance=1000.0, margin=sum(p.volume for p in self.positions.values()))
+
+    def positions_total(self):
+        return len(self.positions)
+
+    def orders_total(self):
+        return 0
+
+    def history_deals_total(self, date_from, date_to):
+        return self.deals
+
+    def positions_get(self):
+        return list(self.positions.values())
+
+    def orders_get(self):
+        return []
+
+    def last_error(self):
+        return (1, "Fake error")
+
+    def order_send(self, request):
+        self.sent.append(dict(request))
+        if request["action"] == self.TRADE_ACTION_SLTP:
+            position = self.positions[request["position"]]
+            position.tp, position.sl = request["tp"], request["sl"]
+            return SimpleNamespace(retcode=self.TRADE_RETCODE_DONE, comment="Done", order=0)
+        self.deals += 1
+        if "position" in request:
+            position = self.positions[request["position"]]
+            position.volume = round(position.volume - request["volume"], 8)
+            if position.volume <= 0:
+                del self.positions[request["position"]]
+            return SimpleNamespace(retcode=self.TRADE_RETCODE_DONE, comment="Done", order=0)
+        ticket = self.add_position(
+            request["symbol"],
+            request["volume"],
+            "buy" if request["type"] == self.ORDER_TYPE_BUY else "sell",
+            request["tp"],
+            request["sl"],
+            request["magic"],
+            request["comment"],
+        )
+        return SimpleNamespace(retcode=self.TRADE_RETCODE_DONE, comment="Done", order=ticket)
+
+
+def only(terminal):
+    (position,) = terminal.positions.values()
+    return position
+
+
+def test_copier_follows_a_position_through_its_life():
+    master = FakeTerminal()
+    scaled, fixed = FakeTerminal(2000), FakeTerminal(3000)
+    master.add_position("BTCUSD", 1.0)
+    copier = TradeCopier(
+        master,
+        [
+            Follower(scaled, "scaled", volume_scale=0.5),
+            Follower(fixed, "fixed", fixed_volume=0.1, symbol_map={"XAUUSD": "XAUUSDm"}),
+        ],
+    )
+
+    # Positions open before start-up are left alone
+    assert copier.poll() == []
+    assert not scaled.positions and not fixed.positions
+
+    ticket = master.add_position("XAUUSD", 0.4, tp=110.0, sl=90.0)
+    results = copier.poll()
+    assert [(r["follower"], r["action"], r["ok"]) for r in results] == [
+        ("scaled", "open", True),
+        ("fixed", "open", True),
+    ]
+    copy = only(scaled)
+    assert (copy.symbol, copy.volume, copy.tp, copy.sl) == ("XAUUSD", 0.2, 110.0, 90.0)
+    assert copy.comment == f"copy {ticket}" and copy.type == FakeTerminal.ORDER_TYPE_BUY
+    assert (only(fixed).symbol, only(fixed).volume) == ("XAUUSDm", 0.1)
+
+    master.positions[ticket].tp, master.positions[ticket].sl = 120.0, 95.0
+    assert [r["action"] for r in copier.poll()] == ["sltp", "sltp"]
+    assert (only(scaled).tp, only(scaled).sl) == (120.0, 95.0)
+    assert (only(fixed).tp, only(fixed).sl) == (120.0, 95.0)
+
+    # Halving the master halves the scaled copy; the fixed copy stays at its minimum
+    master.positions[ticket].volume = 0.2
+    master.deals += 1
+    results = copier.poll()
+    assert [(r["follower"], r["action"]) for r in results] == [("scaled", "partial_close")]
+    assert only(scaled).volume == pytest.approx(0.1)
+    assert scaled.sent[-1]["type"] == FakeTerminal.ORDER_TYPE_SELL
+    assert only(fixed).volume == 0.1
+
+    del master.positions[ticket]
+    results = copier.poll()
+    assert [(r["follower"], r["action"], r["ok"]) for r in results] == [
+        ("scaled", "close", True),
+        ("fixed", "close", True),
+    ]
+    assert not scaled.positions and not fixed.positions
+    assert all(not follower.links for follower in copier.followers)
+    assert copier.errors == 0
+    assert copier.lag_report()["scaled/partial_close"]["count"] == 1
+
+
+def test_unparsable_copy_comments_are_skipped(caplog):
+    master, terminal = FakeTerminal(), FakeTerminal(2000)
+    linked = terminal.add_position("XAUUSD", 0.2, magic=54321, comment="copy 77")
+    terminal.add_position("XAUUSD", 0.1, magic=54321, comment="copy manual hedge")
+    terminal.add_position("XAUUSD", 0.1, magic=1, comment="copy 78")
+    master.positions[77] = SimpleNamespace(
+        ticket=77, symbol="XAUUSD", type=0, volume=0.2, tp=0.0, sl=0.0, magic=1, comment=""
+    )
+    follower = Follower(terminal, "follower")
+    copier = TradeCopier(master, [follower])
+
+    with caplog.at_level(logging.WARNING):
+        assert copier.poll() == []
+
+    assert list(follower.links) == [77]
+    assert follower.links[77]["ticket"] == linked
+    assert any("copy manual hedge" in r.getMessage() for r in caplog.records)
+
+    # The restored link is closed when its master position goes away
+    del master.positions[77]
+    assert [r["action"] for r in copier.poll()] == ["close"]
+    assert linked not in terminal.positions